@@ -1,14 +1,52 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Final, Tuple
+
 from thalex.thalex import Network
 
 
-@dataclass(frozen=True)
-class QuoterConfig:
+@dataclass(frozen=True, slots=True)
+class TimingParams:
+    """Cooldown, recovery and interval settings, kept together in one group"""
+    # Cooldown parameters
+    bid_fill_cooldown: float = 5.0  # seconds to wait after a bid fill before requoting bid side
+    ask_fill_cooldown: float = 5.0  # seconds to wait after an ask fill before requoting ask side
+
+    # Recovery parameters
+    bid_fill_recovery: float = 30.0  # seconds after cooldown with increased spread
+    ask_fill_recovery: float = 30.0  # seconds after cooldown with increased spread
+    recovery_spread_multiplier: float = 3.0  # multiply normal spread by this factor during recovery
+
+    # Update intervals
+    volatility_update_interval: int = 300  # Update volatility every 5 minutes
+    log_interval: int = 5
+    quote_refresh_interval: float = 10.0  # Re-send unchanged quotes at least this often (seconds)
+
+
+@dataclass(frozen=True, slots=True)
+class BootstrapConfig:
+    """Settings used while connecting and setting up the session (cold path)"""
     # Network and instrument settings
     network: Network = Network.TEST
     instrument: str = "BTC-PERPETUAL"
     order_label: str = "simple_quoter"
-    
+
+    # Quote IDs
+    bid_ids: Tuple[int, ...] = (1001,)
+    ask_ids: Tuple[int, ...] = (1002,)
+
+    def __post_init__(self):
+        if not self.bid_ids or not self.ask_ids:
+            raise ValueError("bid_ids and ask_ids must not be empty")
+
+        # Interned so comparisons against exchange messages hit the identity fast path
+        object.__setattr__(self, 'instrument', sys.intern(self.instrument))
+        object.__setattr__(self, 'order_label', sys.intern(self.order_label))
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeParams:
+    """Parameters read on every quote cycle (hot path)"""
     # Price and size ticks
     price_tick: float = 1.0  # USD
     size_tick: float = 0.001  # Contracts
@@ -18,37 +56,89 @@ class QuoterConfig:
     max_spread_bps: float = 2.5  # Maximum spread in basis points
     volatility_multiplier: float = 0.5  # How much to adjust spread based on volatility
     
-    # Cooldown parameters
-    bid_fill_cooldown: float = 5.0  # seconds to wait after a bid fill before requoting bid side
-    ask_fill_cooldown: float = 5.0  # seconds to wait after an ask fill before requoting ask side
-    
-    # Recovery parameters
-    bid_fill_recovery: float = 30.0  # seconds after cooldown with increased spread
-    ask_fill_recovery: float = 30.0  # seconds after cooldown with increased spread
-    recovery_spread_multiplier: float = 3.0  # multiply normal spread by this factor during recovery
+    # Cooldown, recovery and update intervals
+    timing: TimingParams = field(default_factory=TimingParams)
     
     # Order management
     amend_threshold: int = 5  # USD
     size: float = 0.01
     max_position: float = 0.3
     
-    # Update intervals
-    volatility_update_interval: int = 300  # Update volatility every 5 minutes
-    log_interval: int = 5
-    
     # Fee settings
     fee_rate_bps: float = 2.5  # 2.5 basis points = 0.00025
-    
-    # Quote IDs
-    quote_ids: dict = None
-    
+
+    # Derived values, computed once at construction
+    min_spread_frac: float = field(init=False, repr=False, compare=False)
+    max_spread_frac: float = field(init=False, repr=False, compare=False)
+    spread_range_frac: float = field(init=False, repr=False, compare=False)
+    fee_frac: float = field(init=False, repr=False, compare=False)
+    inv_price_tick: float = field(init=False, repr=False, compare=False)
+    inv_size_tick: float = field(init=False, repr=False, compare=False)
+    amend_threshold_f: float = field(init=False, repr=False, compare=False)
+    pos_factor: Dict[int, float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._validate()
+
+        # Basis points as fractions, so the quote path multiplies instead of dividing
+        object.__setattr__(self, 'min_spread_frac', self.min_spread_bps * 1e-4)
+        object.__setattr__(self, 'max_spread_frac', self.max_spread_bps * 1e-4)
+        object.__setattr__(self, 'spread_range_frac', self.max_spread_frac - self.min_spread_frac)
+        object.__setattr__(self, 'fee_frac', self.fee_rate_bps * 1e-4)
+        # Tick reciprocals, so rounding to the grid multiplies instead of dividing
+        object.__setattr__(self, 'inv_price_tick', 1.0 / self.price_tick)
+        object.__setattr__(self, 'inv_size_tick', 1.0 / self.size_tick)
+        # Float copy for comparisons against float price deltas
+        object.__setattr__(self, 'amend_threshold_f', float(self.amend_threshold))
+        # (|P| / max_position) ** 2 for every position on the size-tick grid, keyed by tick count
+        steps = round(self.max_position * self.inv_size_tick)
+        object.__setattr__(self, 'pos_factor', {
+            i: min((abs(i * self.size_tick) / self.max_position) ** 2, 1.0) for i in range(-steps, steps + 1)
+        })
+
+    def round_to_tick(self, value: float) -> float:
+        """Round a price value to the nearest tick of this snapshot."""
+        return self.price_tick * round(value * self.inv_price_tick)
+
+    def round_size(self, size: float) -> float:
+        """Round a size value to the nearest size tick of this snapshot."""
+        return self.size_tick * round(size * self.inv_size_tick)
+
+    def _validate(self):
+        """Check parameter ranges once so the quoting path can rely on them."""
+        if not 0 < self.min_spread_bps <= self.max_spread_bps:
+            raise ValueError(f"Need 0 < min_spread_bps <= max_spread_bps, got {self.min_spread_bps} and {self.max_spread_bps}")
+        for name in ("price_tick", "size_tick", "size", "max_position"):
+            if not getattr(self, name) > 0:
+                raise ValueError(f"{name} must be positive, got {getattr(self, name)}")
+        for name in ("recovery_spread_multiplier", "volatility_update_interval", "log_interval", "quote_refresh_interval"):
+            if not getattr(self.timing, name) > 0:
+                raise ValueError(f"timing.{name} must be positive, got {getattr(self.timing, name)}")
+        for name in ("volatility_multiplier", "amend_threshold", "fee_rate_bps"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative, got {getattr(self, name)}")
+        for name in ("bid_fill_cooldown", "ask_fill_cooldown", "bid_fill_recovery", "ask_fill_recovery"):
+            if getattr(self.timing, name) < 0:
+                raise ValueError(f"timing.{name} must not be negative, got {getattr(self.timing, name)}")
+
+
+@dataclass(frozen=True, slots=True)
+class _QuoterConfig:
+    boot: BootstrapConfig = field(default_factory=BootstrapConfig)
+    rt: RuntimeParams = field(default_factory=RuntimeParams)
+
+    # Hash computed once at construction
+    _hash: int = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
-        if self.quote_ids is None:
-            object.__setattr__(self, 'quote_ids', {
-                "bid": [1001],
-                "ask": [1002]
-            })
+        object.__setattr__(self, '_hash', hash((self.boot, self.rt)))
+
+    def __hash__(self):
+        return self._hash
+
 
+# Global configuration instance; the only one the bot should use (type(cfg) for the class)
+cfg: Final[_QuoterConfig] = _QuoterConfig()
 
-# Global configuration instance
-cfg = QuoterConfig() 
\ No newline at end of file
+# Fee fraction read on every order update, exposed as a plain module constant
+FEE_FRAC: Final[float] = cfg.rt.fee_frac
@@ -0,0 +1,86 @@
+import base64
+import functools
+import json
+import os
+from typing import NamedTuple, Optional, Tuple
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+
+import thalex
+
+# You have to create api keys on thalex ui.
+# TEST: https://testnet.thalex.com/exchange/user/api
+# PROD: https://thalex.com/exchange/user/api
+#
+# The keys are read from the environment, so no secret has to live in source:
+#   THALEX_KEY_ID_TEST       key id for the test network
+#   THALEX_PRIVATE_KEY_TEST  PEM encoded private key for the test network
+#   THALEX_KEY_ID_PROD       key id for the production network
+#   THALEX_PRIVATE_KEY_PROD  PEM encoded private key for the production network
+# Only the variables for the network you quote on need to be set.
+
+
+class KeyStore(NamedTuple):
+    test_key: Optional[str]
+    prod_key: Optional[str]
+    test_id: Optional[str]
+    prod_id: Optional[str]
+
+
+@functools.cache
+def _key_store() -> KeyStore:
+    env = os.environ.get
+    return KeyStore(
+        test_key=env("THALEX_PRIVATE_KEY_TEST"),
+        prod_key=env("THALEX_PRIVATE_KEY_PROD"),
+        test_id=env("THALEX_KEY_ID_TEST"),
+        prod_id=env("THALEX_KEY_ID_PROD"),
+    )
+
+
+def creds(network: thalex.Network) -> Tuple[str, str]:
+    """(PEM private key, key id) for a network."""
+    store = _key_store()
+    if network is thalex.Network.TEST:
+        key, kid = store.test_key, store.test_id
+    else:
+        key, kid = store.prod_key, store.prod_id
+    if key is None or kid is None:
+        raise KeyError(f"THALEX_PRIVATE_KEY_{network.name} and THALEX_KEY_ID_{network.name} must be set")
+    return key, kid
+
+
+def key_id(network: thalex.Network) -> str:
+    """Key id for a network."""
+    return creds(network)[1]
+
+
+@functools.cache
+def get_signing_key(network: thalex.Network) -> RSAPrivateKey:
+    """Parse the PEM private key for a network once and reuse the key object."""
+    return serialization.load_pem_private_key(creds(network)[0].encode(), password=None)
+
+
+# Thalex tokens are RS512 signed; padding and hash objects are reused across signatures
+_JWT_PADDING = padding.PKCS1v15()
+_JWT_HASH = hashes.SHA512()
+
+
+def _b64(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+@functools.cache
+def _jwt_header(network: thalex.Network) -> bytes:
+    """Encoded JWT header for a network, built once per process."""
+    header = {"alg": "RS512", "kid": key_id(network), "typ": "JWT"}
+    return _b64(json.dumps(header, separators=(",", ":")).encode())
+
+
+def sign_jwt(network: thalex.Network, payload: dict) -> str:
+    """Sign a JWT for a network, reusing the cached header and signing key."""
+    signing_input = _jwt_header(network) + b"." + _b64(json.dumps(payload, separators=(",", ":")).encode())
+    signature = get_signing_key(network).sign(signing_input, _JWT_PADDING, _JWT_HASH)
+    return (signing_input + b"." + _b64(signature)).decode()
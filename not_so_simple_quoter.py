@@ -1,27 +1,31 @@
 import asyncio
-import json
+import collections
 import logging
+import random
 import socket
 import sys
 import time
 import argparse
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
+import orjson
 import websockets
 import thalex
 from thalex.thalex import Direction, Thalex, Network
-import keys
 from volatility_monitor import get_atm_volatility as volatility_monitor_get_atm_volatility
 from pnl import get_pnl  # Import the new PnL function
 from config import cfg
-from utils import round_to_tick, round_size, calculate_fee_amount
+from utils import calculate_fee_amount, event_loop_factory
 from quoter_logger import QuoterLogger
 from websocket_handler import WebSocketHandler
 from notification_handler import NotificationHandler
 
 # Module-level logger
 log = logging.getLogger(__name__)
+INFO = logging.INFO
+DEBUG = logging.DEBUG
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -32,14 +36,43 @@ def parse_arguments():
                        help='Disable verbose logging (default: False)')
     return parser.parse_args()
 
+@dataclass(slots=True)
+class QuoteState:
+    """Last known state of one of our quote orders"""
+    status: str = ""
+    price: float = 0.0
+    direction: Any = None
+    amount: float = 0.0
+
+
 class Quoter:
     def __init__(self, tlx: Thalex, instrument_name: str, volatility: float, log_interval: int = None, vol_update_interval: int = None, verbose: bool = True):
         self.tlx = tlx
         self.instrument_name = instrument_name
         self.volatility = volatility
-        self.log_interval = log_interval or cfg.log_interval
-        self.vol_update_interval = vol_update_interval or cfg.volatility_update_interval
+        self.log_interval = log_interval or cfg.rt.timing.log_interval
+        self.vol_update_interval = vol_update_interval or cfg.rt.timing.volatility_update_interval
         self.verbose = verbose  # Control logging verbosity
+
+        # Runtime params snapshot; the quote path reads its ticks, spreads, sizes and amend
+        # threshold only through this reference, so replacing it swaps them together
+        self._rt = cfg.rt
+        self._bid_cid = cfg.boot.bid_ids[0]
+        self._ask_cid = cfg.boot.ask_ids[0]
+
+        # Pre-serialized insert/amend frames per quote id; amount and price are spliced in with %
+        # (any % in the instrument or label is doubled so the second formatting leaves it literal)
+        instrument = orjson.dumps(instrument_name).decode().replace("%", "%%")
+        label = orjson.dumps(cfg.boot.order_label).decode().replace("%", "%%")
+        self._insert_frames = {
+            cid: '{"method":"private/insert","params":{"direction":"%s","instrument_name":%s,"label":%s,'
+                 '"client_order_id":%s,"amount":%%r,"price":%%r}}' % (side.value, instrument, label, cid)
+            for cid, side in ((self._bid_cid, Direction.BUY), (self._ask_cid, Direction.SELL))
+        }
+        self._amend_frames = {
+            cid: '{"method":"private/amend","params":{"client_order_id":%s,"amount":%%r,"price":%%r}}' % cid
+            for cid in (self._bid_cid, self._ask_cid)
+        }
         
         # Setup logging
         self.logger = QuoterLogger(verbose=verbose)
@@ -48,7 +81,7 @@ class Quoter:
         self.notification_handler = NotificationHandler(
             logger=self.logger,
             instrument_name=instrument_name,
-            on_order_update=self._on_order_update,
+            on_orders_update=self._on_orders_update,
             on_position_update=self._on_position_update,
             on_trade_update=self._on_trade_update,
             on_pnl_update=self._on_pnl_update,
@@ -61,7 +94,9 @@ class Quoter:
         
         # State variables
         self.mid: Optional[float] = None
-        self.quotes = {}
+        self._reset_quotes()
+        self._next_forced_refresh = 0.0  # loop time at which unchanged quotes are re-sent anyway
+        self._logged_excs = set()  # (site, exception type) pairs already logged with a traceback
         self.position: Optional[float] = None
         self.last_bid_spread = None
         self.last_ask_spread = None
@@ -75,6 +110,9 @@ class Quoter:
         self.total_fees_paid = 0.0  # Track total fees paid in session
         self.last_account_update = 0
         
+        # Event loop whose monotonic clock drives the cooldown/recovery deadlines, set in quote()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Cooldown state
         self.last_bid_fill_time: Optional[float] = None
         self.last_ask_fill_time: Optional[float] = None
@@ -87,8 +125,18 @@ class Quoter:
         
         # Desync recovery state
         self.recovering_from_desync = False
+        self._cancel_all_pending = 0  # quote orders still awaiting their cancel_all notification
+        self._cancel_all_done = asyncio.Event()
+
+        # (level, fmt, args) records queued on the quote path and emitted by _log_drain;
+        # level None means plain stdout output
+        self._log_ring = collections.deque(maxlen=4096)
+
+        # Latest (mid, best_bid, best_ask) snapshot waiting to be quoted
+        self._latest_tick: Optional[tuple] = None
+        self._tick_event = asyncio.Event()
 
-    async def _on_exchange_error(self, error_data: dict):
+    def _on_exchange_error(self, error_data: dict):
         """Callback for handling exchange-level errors."""
         message = error_data.get("message", "")
         if "order not found" in message and not self.recovering_from_desync:
@@ -102,15 +150,21 @@ class Quoter:
         log.warning("Cancelling all orders to resynchronize state...")
 
         try:
+            self._cancel_all_pending = sum(q.status in ("open", "partially_filled") for q in (self._quote_bid, self._quote_ask))
+            self._cancel_all_done.clear()
             await self.tlx.cancel_all()
             log.info("cancel_all request sent successfully.")
 
             # Clear local order cache
-            self.quotes.clear()
+            self._reset_quotes()
             log.warning("Local order cache cleared.")
             
-            # Allow some time for cancellation notifications to be processed
-            await asyncio.sleep(2) 
+            # Wait for the cancellation notifications of the orders we believed open
+            if self._cancel_all_pending:
+                try:
+                    await asyncio.wait_for(self._cancel_all_done.wait(), timeout=2.0)
+                except asyncio.TimeoutError:
+                    log.warning("Timed out waiting for cancel_all notifications")
             
         except Exception as e:
             log.error(f"Error during desync recovery: {e}", exc_info=True)
@@ -118,31 +172,71 @@ class Quoter:
             log.warning("====== RECOVERY MODE CONCLUDED ======")
             self.recovering_from_desync = False
 
+    def _log_exc_once(self, site: str, message: str, exc: Exception):
+        """Log an error, with the traceback only the first time this site sees this exception type"""
+        key = (site, type(exc))
+        first = key not in self._logged_excs
+        if first:
+            self._logged_excs.add(key)
+        self.logger.log_error(f"{message}: {exc}", exc_info=first)
+
+    def _reset_quotes(self):
+        """Forget the last known state of both quote orders"""
+        self._quote_bid = QuoteState()
+        self._quote_ask = QuoteState()
+        # (price, amount) last successfully sent per side, None when unknown
+        self._last_sent_bid: Optional[tuple] = None
+        self._last_sent_ask: Optional[tuple] = None
+
     # Notification callback methods
-    def _on_order_update(self, client_order_id: str, order_data: dict):
+    def _on_orders_update(self, updates: list):
+        """Callback for a batch of order updates from one notification, applied in order"""
+        on_order_update = self._on_order_update
+        for client_order_id, status, order, fee_amount in updates:
+            on_order_update(client_order_id, status, order, fee_amount)
+
+    def _on_order_update(self, client_order_id: int, status: str, order: dict, fee_amount: Optional[float] = None):
         """Callback for order updates"""
-        order = order_data["order"]
-        status = order_data["status"]
-        
         # Update local state with the latest order information
-        self.quotes[client_order_id] = order
+        is_bid = client_order_id == self._bid_cid
+        is_open = status in ("open", "partially_filled")
+        if is_bid:
+            quote = self._quote_bid
+            if not is_open:
+                self._last_sent_bid = None
+        elif client_order_id == self._ask_cid:
+            quote = self._quote_ask
+            if not is_open:
+                self._last_sent_ask = None
+        else:
+            return  # Not one of our quote orders
+        if not is_open and self.recovering_from_desync and self._cancel_all_pending:
+            self._cancel_all_pending -= 1
+            if not self._cancel_all_pending:
+                self._cancel_all_done.set()
+        quote.status = status
+        quote.price = order.get("price", 0.0)
+        quote.direction = order.get("direction")
+        quote.amount = order.get("amount", 0.0)
         
         # Handle fills and update cooldowns
         if status == "filled":
-            fill_time = order_data["fill_time"]
-            fee_amount = order_data["fee_amount"]
+            fill_time = self._loop.time()
             self.total_fees_paid += fee_amount
+            timing = self._rt.timing
             
-            if str(client_order_id) == str(cfg.quote_ids["bid"][0]):
+            if is_bid:
                 self.last_bid_fill_time = fill_time
-                self.bid_cooldown_until = fill_time + cfg.bid_fill_cooldown
-                self.bid_recovery_until = fill_time + cfg.bid_fill_cooldown + cfg.bid_fill_recovery
-                log.info(f"Bid fill detected, cooldown until {self.bid_cooldown_until}, recovery until {self.bid_recovery_until}")
-            elif str(client_order_id) == str(cfg.quote_ids["ask"][0]):
+                self.bid_cooldown_until = fill_time + timing.bid_fill_cooldown
+                self.bid_recovery_until = fill_time + timing.bid_fill_cooldown + timing.bid_fill_recovery
+                if log.isEnabledFor(INFO):
+                    log.info("Bid fill detected, cooldown until %s, recovery until %s", self.bid_cooldown_until, self.bid_recovery_until)
+            else:
                 self.last_ask_fill_time = fill_time
-                self.ask_cooldown_until = fill_time + cfg.ask_fill_cooldown
-                self.ask_recovery_until = fill_time + cfg.ask_fill_cooldown + cfg.ask_fill_recovery
-                log.info(f"Ask fill detected, cooldown until {self.ask_cooldown_until}, recovery until {self.ask_recovery_until}")
+                self.ask_cooldown_until = fill_time + timing.ask_fill_cooldown
+                self.ask_recovery_until = fill_time + timing.ask_fill_cooldown + timing.ask_fill_recovery
+                if log.isEnabledFor(INFO):
+                    log.info("Ask fill detected, cooldown until %s, recovery until %s", self.ask_cooldown_until, self.ask_recovery_until)
 
     def _on_position_update(self, position: float):
         """Callback for position updates"""
@@ -151,7 +245,10 @@ class Quoter:
     def _on_trade_update(self):
         """Callback for trade updates"""
         if self.mid is not None:
-            asyncio.create_task(self.update_quotes(self.mid))
+            # A pending ticker snapshot is fresher and carries the book, keep it
+            if not self._tick_event.is_set():
+                self._latest_tick = (self.mid, None, None)
+            self._tick_event.set()
 
     def _on_pnl_update(self, unrealised_pnl: Optional[float], realised_pnl: Optional[float]):
         """Callback for PnL updates"""
@@ -160,30 +257,30 @@ class Quoter:
 
     def _on_ticker_update(self, mid_price: float, best_bid: Optional[float], best_ask: Optional[float]):
         """Callback for ticker updates"""
-        asyncio.create_task(self.update_quotes(mid_price, best_bid, best_ask))
+        self._latest_tick = (mid_price, best_bid, best_ask)
+        self._tick_event.set()
 
-    async def refresh_order_status(self, client_order_id: str):
-        """Refresh the status of a specific order from the exchange"""
-        try:
-            # Request order status from exchange
-            await self.tlx.order_status(client_order_id=int(client_order_id))
-        except Exception as e:
-            log.debug(f"Could not refresh order status for {client_order_id}: {e}")
+    async def _quote_worker(self):
+        """Re-quote from the freshest snapshot, collapsing bursts of updates into one."""
+        while True:
+            await self._tick_event.wait()
+            self._tick_event.clear()
+            try:
+                await self.update_quotes(*self._latest_tick)
+            except Exception as e:
+                self._log_exc_once("update_quotes", "Error updating quotes", e)
 
     def dump_order_states(self):
         """Debug method to dump the current state of all orders"""
         log.info("=== CURRENT ORDER STATES ===")
-        for cid, order in self.quotes.items():
-            status = order.get("status", "unknown")
-            price = order.get("price", "unknown")
-            direction = order.get("direction", "unknown")
-            log.info(f"Order {cid}: status='{status}', price={price}, direction={direction}")
+        for cid, order in ((self._bid_cid, self._quote_bid), (self._ask_cid, self._quote_ask)):
+            log.info(f"Order {cid}: status='{order.status or 'unknown'}', price={order.price}, direction={order.direction}")
         log.info("=== END ORDER STATES ===")
 
     async def update_volatility_loop(self):
         while True:
             try:
-                atm_vol = volatility_monitor_get_atm_volatility()
+                atm_vol = await volatility_monitor_get_atm_volatility()
                 if atm_vol is not None:
                     self.current_volatility = atm_vol
                     self.last_volatility_update = time.time()
@@ -192,25 +289,32 @@ class Quoter:
                     log.warning("volatility_monitor.get_atm_volatility() returned None; volatility not updated.")
             except Exception as e:
                 log.error(f"Error updating volatility: {e}")
-            await asyncio.sleep(self.vol_update_interval)
+            await asyncio.sleep(self.vol_update_interval * random.uniform(0.9, 1.1))
 
     async def log_loop(self):
+        # (epoch_day, "YYYY-MM-DD ") so strftime only runs once per UTC day
+        day_cache = (None, "")
         while True:
             try:
                 # Get current timestamp
-                timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+                day, secs = divmod(time.time_ns() // 1_000_000_000, 86400)
+                if day != day_cache[0]:
+                    day_cache = (day, datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y-%m-%d "))
+                hours, secs = divmod(secs, 3600)
+                minutes, secs = divmod(secs, 60)
+                timestamp = f"{day_cache[1]}{hours:02d}:{minutes:02d}:{secs:02d}"
                 
                 # Get PnL values using the new method right before logging
-                pnl_result = get_pnl()
+                pnl_result = await get_pnl()
                 if pnl_result:
                     self.unrealised_pnl, self.realised_pnl = pnl_result
-                    log.debug(f"Updated PnL in log_loop - Actual: {self.unrealised_pnl}, {self.realised_pnl}")
+                    log.debug("Updated PnL in log_loop - Actual: %s, %s", self.unrealised_pnl, self.realised_pnl)
                 else:
                     self.logger.log_warning("Failed to get PnL values from account summary endpoint")
                 
                 # Calculate current size scale
                 if self.current_volatility is not None:
-                    size_scale = 1 / (1 + self.current_volatility * cfg.volatility_multiplier)
+                    size_scale = 1 / (1 + self.current_volatility * self._rt.volatility_multiplier)
                 else:
                     size_scale = 1.0
                 
@@ -243,13 +347,42 @@ class Quoter:
             except Exception as e:
                 self.logger.log_error(f"Error in log_loop: {e}")
                 
-            await asyncio.sleep(self.log_interval)
+            await asyncio.sleep(self.log_interval * random.uniform(0.9, 1.1))
+
+    async def _log_drain(self):
+        """Format and emit the records queued on the quote path, one batch at a time."""
+        try:
+            while True:
+                await asyncio.sleep(0.05)
+                self._flush_log_ring()
+        finally:
+            self._flush_log_ring()
+
+    def _flush_log_ring(self):
+        """Emit every queued record; stdout lines are written with a single flush"""
+        ring = self._log_ring
+        lines = []
+        while ring:
+            level, fmt, args = ring.popleft()
+            if level is None:
+                lines.append(fmt % args)
+            else:
+                log.log(level, fmt, *args)
+        if lines:
+            lines.append("")
+            sys.stdout.write("\n".join(lines))
+            sys.stdout.flush()
 
     async def update_quotes(self, new_mid, best_bid: Optional[float] = None, best_ask: Optional[float] = None):
         if self.position is None:
             return
 
-        current_time = time.time()
+        rt = self._rt
+        max_pos = rt.max_position
+        ring = self._log_ring
+        info = log.isEnabledFor(INFO)
+
+        current_time = self._loop.time()
         
         # Check if sides are in cooldown or recovery
         bid_in_cooldown = self.bid_cooldown_until is not None and current_time < self.bid_cooldown_until
@@ -259,211 +392,244 @@ class Quoter:
         
         # Debug logging for recovery state
         if bid_in_recovery or ask_in_recovery:
-            log.info(f"Recovery state - Bid cooldown until: {self.bid_cooldown_until}, recovery until: {self.bid_recovery_until}, "
-                    f"Ask cooldown until: {self.ask_cooldown_until}, recovery until: {self.ask_recovery_until}, "
-                    f"Current time: {current_time}")
-            log.info(f"Recovery flags - Bid in recovery: {bid_in_recovery}, Ask in recovery: {ask_in_recovery}")
-        elif self.bid_recovery_until is not None or self.ask_recovery_until is not None:
+            if info:
+                ring.append((INFO, "Recovery state - Bid cooldown until: %s, recovery until: %s, "
+                                   "Ask cooldown until: %s, recovery until: %s, Current time: %s",
+                             (self.bid_cooldown_until, self.bid_recovery_until,
+                              self.ask_cooldown_until, self.ask_recovery_until, current_time)))
+                ring.append((INFO, "Recovery flags - Bid in recovery: %s, Ask in recovery: %s", (bid_in_recovery, ask_in_recovery)))
+        elif (self.bid_recovery_until is not None or self.ask_recovery_until is not None) and log.isEnabledFor(DEBUG):
             # Log when recovery periods are set but not currently active
-            log.debug(f"Recovery periods set - Bid recovery until: {self.bid_recovery_until}, Ask recovery until: {self.ask_recovery_until}, Current time: {current_time}")
+            log.debug("Recovery periods set - Bid recovery until: %s, Ask recovery until: %s, Current time: %s",
+                      self.bid_recovery_until, self.ask_recovery_until, current_time)
         
         if bid_in_cooldown and ask_in_cooldown:
-            log.info("Both sides in cooldown, skipping quote update")
+            if info:
+                ring.append((INFO, "Both sides in cooldown, skipping quote update", ()))
             return
 
-        # Calculate base spread using volatility
+        # Calculate base spread (as a fraction of mid) using volatility
         if self.current_volatility is not None:
-            base_spread = cfg.min_spread_bps + (cfg.max_spread_bps - cfg.min_spread_bps) * self.current_volatility * cfg.volatility_multiplier
+            base_spread_frac = rt.min_spread_frac + rt.spread_range_frac * self.current_volatility * rt.volatility_multiplier
         else:
-            base_spread = cfg.min_spread_bps
+            base_spread_frac = rt.min_spread_frac
 
         # Position-based spread adjustment
         P = self.position
-        clamped_P = max(min(P, cfg.max_position), -cfg.max_position)
-        position_factor = (abs(clamped_P) / cfg.max_position) ** 2
+        position_factor = rt.pos_factor.get(round(P * rt.inv_size_tick))
+        if position_factor is None:  # Beyond max_position
+            clamped_P = max(min(P, max_pos), -max_pos)
+            position_factor = (abs(clamped_P) / max_pos) ** 2
         
-        bid_spread = base_spread * (1 + position_factor) if P > 0 else base_spread
-        ask_spread = base_spread * (1 + position_factor) if P < 0 else base_spread
+        bid_spread_frac = base_spread_frac * (1 + position_factor) if P > 0 else base_spread_frac
+        ask_spread_frac = base_spread_frac * (1 + position_factor) if P < 0 else base_spread_frac
         
         # Apply recovery multiplier if in recovery period
+        recovery_mult = rt.timing.recovery_spread_multiplier
         if bid_in_recovery:
-            original_bid_spread = bid_spread
-            bid_spread *= cfg.recovery_spread_multiplier
-            log.info(f"Bid in recovery period, applying {cfg.recovery_spread_multiplier}x spread multiplier: {original_bid_spread:.2f}bps -> {bid_spread:.2f}bps")
+            original_bid_spread_frac = bid_spread_frac
+            bid_spread_frac *= recovery_mult
+            if info:
+                ring.append((INFO, "Bid in recovery period, applying %sx spread multiplier: %.2fbps -> %.2fbps",
+                             (recovery_mult, original_bid_spread_frac * 10000, bid_spread_frac * 10000)))
         if ask_in_recovery:
-            original_ask_spread = ask_spread
-            ask_spread *= cfg.recovery_spread_multiplier
-            log.info(f"Ask in recovery period, applying {cfg.recovery_spread_multiplier}x spread multiplier: {original_ask_spread:.2f}bps -> {ask_spread:.2f}bps")
-
+            original_ask_spread_frac = ask_spread_frac
+            ask_spread_frac *= recovery_mult
+            if info:
+                ring.append((INFO, "Ask in recovery period, applying %sx spread multiplier: %.2fbps -> %.2fbps",
+                             (recovery_mult, original_ask_spread_frac * 10000, ask_spread_frac * 10000)))
+
+        # Spreads are reported in basis points
+        bid_spread = bid_spread_frac * 10000
+        ask_spread = ask_spread_frac * 10000
         self.last_bid_spread = bid_spread
         self.last_ask_spread = ask_spread
 
-        if self.current_volatility is not None:
-            log.info(f"Spread components - Base: {cfg.min_spread_bps:.2f}bps, "
-                    f"Volatility: {self.current_volatility:.4%}, "
-                    f"Base spread: {base_spread:.2f}bps, "
-                    f"Position factor: {position_factor:.2f}, "
-                    f"Final spreads - Bid: {bid_spread:.2f}bps, Ask: {ask_spread:.2f}bps")
-
-        bid_price = round_to_tick(new_mid - (bid_spread / 10000 * new_mid))
-        ask_price = round_to_tick(new_mid + (ask_spread / 10000 * new_mid))
+        if info and self.current_volatility is not None:
+            ring.append((INFO, "Spread components - Base: %.2fbps, Volatility: %.4f%%, Base spread: %.2fbps, "
+                               "Position factor: %.2f, Final spreads - Bid: %.2fbps, Ask: %.2fbps",
+                         (rt.min_spread_bps, self.current_volatility * 100, base_spread_frac * 10000,
+                          position_factor, bid_spread, ask_spread)))
+
+        round_to_tick = rt.round_to_tick
+        round_size = rt.round_size
+        bid_price = round_to_tick(new_mid - bid_spread_frac * new_mid)
+        ask_price = round_to_tick(new_mid + ask_spread_frac * new_mid)
         
         # Market crossing protection - ensure we don't cross the market
         if best_bid is not None and bid_price >= best_bid:
-            bid_price = round_to_tick(best_bid - cfg.price_tick)  # One tick below best bid
-            log.info(f"Adjusted bid price to avoid crossing market: {bid_price:.2f} (best_bid: {best_bid:.2f})")
+            bid_price = round_to_tick(best_bid - rt.price_tick)  # One tick below best bid
+            if info:
+                ring.append((INFO, "Adjusted bid price to avoid crossing market: %.2f (best_bid: %.2f)", (bid_price, best_bid)))
         
         if best_ask is not None and ask_price <= best_ask:
-            ask_price = round_to_tick(best_ask + cfg.price_tick)  # One tick above best ask
-            log.info(f"Adjusted ask price to avoid crossing market: {ask_price:.2f} (best_ask: {best_ask:.2f})")
+            ask_price = round_to_tick(best_ask + rt.price_tick)  # One tick above best ask
+            if info:
+                ring.append((INFO, "Adjusted ask price to avoid crossing market: %.2f (best_ask: %.2f)", (ask_price, best_ask)))
 
         # Adjust size based on volatility
         if self.current_volatility is not None:
-            size_scale = 1 / (1 + self.current_volatility * cfg.volatility_multiplier)
+            size_scale = 1 / (1 + self.current_volatility * rt.volatility_multiplier)
         else:
             size_scale = 1.0
         
-        adjusted_size = cfg.size * size_scale
+        adjusted_size = rt.size * size_scale
         
-        # Stop quoting on sides that would exceed MAX_POSITION
-        if self.position >= cfg.max_position:
+        # Stop quoting on sides that would exceed max_position
+        if self.position >= max_pos:
             bid_size = 0  # Stop quoting bids when at max long position
-            ask_size = round_size(max(min(adjusted_size, cfg.max_position + self.position), 0))
-            log.info(f"At max long position ({self.position:.3f}), stopping bid quotes")
-        elif self.position <= -cfg.max_position:
-            bid_size = round_size(max(min(adjusted_size, cfg.max_position - self.position), 0))
+            ask_size = round_size(max(min(adjusted_size, max_pos + self.position), 0))
+            if info:
+                ring.append((INFO, "At max long position (%.3f), stopping bid quotes", (self.position,)))
+        elif self.position <= -max_pos:
+            bid_size = round_size(max(min(adjusted_size, max_pos - self.position), 0))
             ask_size = 0  # Stop quoting asks when at max short position
-            log.info(f"At max short position ({self.position:.3f}), stopping ask quotes")
+            if info:
+                ring.append((INFO, "At max short position (%.3f), stopping ask quotes", (self.position,)))
         else:
-            bid_size = round_size(max(min(adjusted_size, cfg.max_position - self.position), 0))
-            ask_size = round_size(max(min(adjusted_size, cfg.max_position + self.position), 0))
+            bid_size = round_size(max(min(adjusted_size, max_pos - self.position), 0))
+            ask_size = round_size(max(min(adjusted_size, max_pos + self.position), 0))
 
-        print(f"[QUOTE INFO] Position: {self.position:.4f}, "
-              f"Bid: {bid_price:.2f} (spread: {bid_spread:.2f}bps, size: {bid_size:g})"
-              f"{' [COOLDOWN]' if bid_in_cooldown else ' [RECOVERY]' if bid_in_recovery else ''}; "
-              f"Ask: {ask_price:.2f} (spread: {ask_spread:.2f}bps, size: {ask_size:g})"
-              f"{' [COOLDOWN]' if ask_in_cooldown else ' [RECOVERY]' if ask_in_recovery else ''}", flush=True)
+        ring.append((None, "[QUOTE INFO] Position: %.4f, Bid: %.2f (spread: %.2fbps, size: %g)%s; "
+                           "Ask: %.2f (spread: %.2fbps, size: %g)%s",
+                     (self.position,
+                      bid_price, bid_spread, bid_size,
+                      " [COOLDOWN]" if bid_in_cooldown else " [RECOVERY]" if bid_in_recovery else "",
+                      ask_price, ask_spread, ask_size,
+                      " [COOLDOWN]" if ask_in_cooldown else " [RECOVERY]" if ask_in_recovery else "")))
 
         self.mid = new_mid
 
+        # Sides whose quote equals what was last sent are skipped, unless a periodic refresh is due
+        force_refresh = current_time >= self._next_forced_refresh
+        if force_refresh:
+            self._next_forced_refresh = current_time + rt.timing.quote_refresh_interval
+
         # Handle cooldown and recovery logic
         if bid_in_cooldown:
             # Cancel existing bid quote using the proper cancel method
-            await self.cancel_order_if_exists(str(cfg.quote_ids["bid"][0]), "bid")
-        else:
+            self._last_sent_bid = None
+            await self.cancel_order_if_exists(Direction.BUY)
+        elif force_refresh or (bid_price, bid_size) != self._last_sent_bid:
             # Quote normally (including during recovery with increased spread)
-            await self.adjust_order(Direction.BUY, bid_price, bid_size, str(cfg.quote_ids["bid"][0]))
+            await self.adjust_order(Direction.BUY, bid_price, bid_size, force_refresh)
             
         if ask_in_cooldown:
             # Cancel existing ask quote using the proper cancel method
-            await self.cancel_order_if_exists(str(cfg.quote_ids["ask"][0]), "ask")
-        else:
+            self._last_sent_ask = None
+            await self.cancel_order_if_exists(Direction.SELL)
+        elif force_refresh or (ask_price, ask_size) != self._last_sent_ask:
             # Quote normally (including during recovery with increased spread)
-            await self.adjust_order(Direction.SELL, ask_price, ask_size, str(cfg.quote_ids["ask"][0]))
+            await self.adjust_order(Direction.SELL, ask_price, ask_size, force_refresh)
 
-    async def adjust_order(self, side, price, amount, client_order_id):
-        confirmed = self.quotes.get(client_order_id, {})
-        status = confirmed.get("status", "")
+    async def adjust_order(self, side: Direction, price, amount, force: bool = False):
+        """Amend or insert the quote on one side; force re-sends it even within the amend threshold"""
+        if side is Direction.BUY:
+            client_order_id, confirmed = self._bid_cid, self._quote_bid
+        else:
+            client_order_id, confirmed = self._ask_cid, self._quote_ask
+        status = confirmed.status
         is_open = status in ["open", "partially_filled"]
 
         # Debug: Log the current state of this order
-        log.debug(f"[ORDER_STATE] {side} order {client_order_id}: status='{status}', is_open={is_open}, confirmed={confirmed}")
+        if log.isEnabledFor(DEBUG):
+            log.debug("[ORDER_STATE] %s order %s: status='%s', is_open=%s, confirmed=%s", side, client_order_id, status, is_open, confirmed)
 
         self.logger.log_adjust_order(side, price, amount, client_order_id, is_open, confirmed)
         
-        # Convert client_order_id to integer for the API
-        client_order_id_int = int(client_order_id)
-        
         if is_open:
-            if amount == 0 or abs(confirmed.get("price", 0) - price) > cfg.amend_threshold:
-                print(f"Amending order {client_order_id} for {side} to {amount:g} @ {price:.2f}", flush=True)
+            if force or amount == 0 or abs(confirmed.price - price) > self._rt.amend_threshold_f:
+                self._log_ring.append((None, "Amending order %s for %s to %g @ %.2f", (client_order_id, side, amount, price)))
                 try:
                     self.logger.log_amend_attempt(client_order_id, side, amount, price)
-                    await self.tlx.amend(
-                        amount=amount,
-                        price=price,
-                        client_order_id=client_order_id_int,
-                    )
+                    await self.tlx.send_raw(self._amend_frames[client_order_id] % (amount, price))
                     self.logger.log_amend_success(client_order_id)
+                    self._mark_sent(side, price, amount)
                 except Exception as e:
                     # If we get "order not found", the order was already filled or cancelled
                     if "order not found" in str(e).lower():
-                        log.debug(f"Order {client_order_id} not found during amend (likely already filled/cancelled)")
+                        log.debug("Order %s not found during amend (likely already filled/cancelled)", client_order_id)
                         # Update local state and try to insert a new order if amount > 0
-                        self.quotes[client_order_id] = {"status": "unknown", "price": price, "direction": side}
+                        self._set_quote(side, "unknown", price, side)
                         
                         # Debug: Dump all order states when we get this error
                         self.dump_order_states()
                         
                         if amount > 0:
-                            await self._insert_new_order(side, price, amount, client_order_id, client_order_id_int)
+                            await self._insert_new_order(side, price, amount, client_order_id)
                         return  # Stop trying to amend this order
                     else:
-                        self.logger.log_error(f"Error amending order {client_order_id} for {side}: {e}", exc_info=True)
+                        self._log_exc_once("amend", f"Error amending order {client_order_id} for {side}", e)
         elif amount > 0:
-            await self._insert_new_order(side, price, amount, client_order_id, client_order_id_int)
+            await self._insert_new_order(side, price, amount, client_order_id)
         else:
             self.logger.log_no_insert(side, price, amount, client_order_id, is_open)
     
-    async def _insert_new_order(self, side, price, amount, client_order_id, client_order_id_int):
+    async def _insert_new_order(self, side, price, amount, client_order_id: int):
         """Helper method to insert a new order"""
-        print(f"Inserting order {client_order_id} for {side}: {amount:g} @ {price:.2f}", flush=True)
+        self._log_ring.append((None, "Inserting order %s for %s: %g @ %.2f", (client_order_id, side, amount, price)))
         self.logger.log_insert_attempt(side, price, amount, client_order_id, self.instrument_name)
         try:
-            await self.tlx.insert(
-                amount=amount,
-                price=price,
-                direction=side,
-                instrument_name=self.instrument_name,
-                client_order_id=client_order_id_int,
-                label=cfg.order_label,
-            )
+            await self.tlx.send_raw(self._insert_frames[client_order_id] % (amount, price))
             self.logger.log_insert_success(client_order_id, side, amount, price)
-            self.quotes[client_order_id] = {"status": "open", "price": price, "direction": side}
+            self._set_quote(side, "open", price, side)
+            self._mark_sent(side, price, amount)
         except Exception as e:
-            self.logger.log_error(f"Error inserting order {client_order_id} for {side}: {e}", exc_info=True)
+            self._log_exc_once("insert", f"Error inserting order {client_order_id} for {side}", e)
+
+    def _set_quote(self, side: Direction, status: str, price, direction):
+        """Record the latest known state of the quote order on the given side"""
+        quote = self._quote_bid if side is Direction.BUY else self._quote_ask
+        quote.status = status
+        quote.price = price
+        quote.direction = direction
+
+    def _mark_sent(self, side: Direction, price, amount):
+        """Remember the quote last sent on the given side"""
+        if side is Direction.BUY:
+            self._last_sent_bid = (price, amount)
+        else:
+            self._last_sent_ask = (price, amount)
 
-    async def cancel_order_if_exists(self, client_order_id: str, side: str):
+    async def cancel_order_if_exists(self, direction: Direction):
         """Cancel an order if it exists and is open"""
-        confirmed = self.quotes.get(client_order_id, {})
-        status = confirmed.get("status", "")
+        if direction is Direction.BUY:
+            side, client_order_id, confirmed = "bid", self._bid_cid, self._quote_bid
+        else:
+            side, client_order_id, confirmed = "ask", self._ask_cid, self._quote_ask
+        status = confirmed.status
         
         # Don't try to cancel orders that are already filled, cancelled, or don't exist
         if status in ["filled", "cancelled"]:
-            log.debug(f"{side.capitalize()} order {client_order_id} already {status}, no cancellation needed")
+            log.debug("%s order %s already %s, no cancellation needed", side.capitalize(), client_order_id, status)
             return
         
-        # If we have no status or unknown status, try to refresh it first
-        if status in ["", "unknown"]:
-            log.debug(f"Refreshing status for {side} order {client_order_id}")
-            await self.refresh_order_status(client_order_id)
-            # Wait a bit for the response
-            await asyncio.sleep(0.1)
-            # Re-check the status
-            confirmed = self.quotes.get(client_order_id, {})
-            status = confirmed.get("status", "")
-        
-        # Only try to cancel if we think the order is open
-        if status in ["open", "partially_filled"]:
-            log.info(f"Cancelling {side} order {client_order_id} due to cooldown")
+        # We never sent this order, so there is nothing to cancel
+        if status == "":
+            log.debug("%s order %s never sent, no cancellation needed", side.capitalize(), client_order_id)
+            return
+
+        # Cancel if we think the order is open; an unknown status may still be open, so it is
+        # cancelled too rather than waiting on a status refresh the exchange would not answer
+        if status in ["open", "partially_filled", "unknown"]:
+            log.info("Cancelling %s order %s due to cooldown", side, client_order_id)
             try:
-                # Convert client_order_id to integer for the API
-                client_order_id_int = int(client_order_id)
-                await self.tlx.cancel(client_order_id=client_order_id_int)
+                await self.tlx.cancel(client_order_id=client_order_id)
                 # Update local state to reflect cancellation
-                self.quotes[client_order_id] = {"status": "cancelled", "price": confirmed.get("price"), "direction": confirmed.get("direction")}
+                confirmed.status = "cancelled"
             except Exception as e:
                 # If we get "order not found", the order was already filled or cancelled
                 if "order not found" in str(e).lower():
-                    log.debug(f"{side.capitalize()} order {client_order_id} not found (likely already filled/cancelled)")
-                    # Update local state to reflect that the order is no longer active
-                    self.quotes[client_order_id] = {"status": "unknown", "price": confirmed.get("price"), "direction": confirmed.get("direction")}
+                    log.debug("%s order %s not found (likely already filled/cancelled)", side.capitalize(), client_order_id)
+                    # The order is already gone, so there is nothing left to cancel on later ticks
+                    confirmed.status = "cancelled"
                 else:
                     log.error(f"Error cancelling {side} order during cooldown: {e}")
         else:
-            log.debug(f"{side.capitalize()} order {client_order_id} not open (status: {status}), no cancellation needed")
+            log.debug("%s order %s not open (status: %s), no cancellation needed", side.capitalize(), client_order_id, status)
 
     async def quote(self):
+        self._loop = asyncio.get_running_loop()
         max_retries = 3
         retry_delay = 1  # seconds
         retry_count = 0
@@ -482,31 +648,25 @@ class Quoter:
                     raise Exception("Connection test failed")
                 self.logger.log_test("Connection test passed!")
 
-                # Start background tasks
-                log.info("Starting background tasks...")
-                vol_task = asyncio.create_task(self.update_volatility_loop())
-                log_task = asyncio.create_task(self.log_loop())
-                ticker_task = asyncio.create_task(self.websocket_handler.ticker_loop(self.instrument_name))
-                account_summary_task = asyncio.create_task(self.websocket_handler.account_summary_loop())
-                log.info("Background tasks started")
-
-                # Start message processing using websocket handler
-                await self.websocket_handler.start_message_processing()
-
-                log.info("Main message loop ended, cleaning up tasks...")
-
-                # Cleanup background tasks
-                for task in [vol_task, log_task, ticker_task, account_summary_task]:
-                    if not task.done():
+                # Background tasks live in a task group: if one fails, the others and the
+                # message loop are cancelled with it, and none outlive this connection attempt
+                async with asyncio.TaskGroup() as tg:
+                    log.info("Starting background tasks...")
+                    background = [
+                        tg.create_task(self.update_volatility_loop()),
+                        tg.create_task(self.log_loop()),
+                        tg.create_task(self._quote_worker()),
+                        tg.create_task(self._log_drain()),
+                        tg.create_task(self.websocket_handler.periodic_loop(self.instrument_name)),
+                    ]
+                    log.info("Background tasks started")
+
+                    # Start message processing using websocket handler
+                    await self.websocket_handler.start_message_processing()
+
+                    log.info("Main message loop ended, cleaning up tasks...")
+                    for task in background:
                         task.cancel()
-                        try:
-                            await task
-                        except asyncio.CancelledError:
-                            pass
-                        except Exception as e:
-                            log.error(f"Error cancelling task: {e}")
-
-                await asyncio.gather(vol_task, log_task, ticker_task, account_summary_task, return_exceptions=True)
 
             except Exception as e:
                 log.error(f"Fatal error in quote loop: {e}", exc_info=True)
@@ -523,6 +683,7 @@ class Quoter:
 
         # Final cleanup
         await self.websocket_handler.cleanup()
+        self.logger.close()
 
 async def main():
     # Parse arguments to determine logging level
@@ -533,6 +694,11 @@ async def main():
     if args.quiet:
         verbose = False
     
+    # Skip the thread/process lookups done for every log record; the bot is single threaded
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     if verbose:
         logging.basicConfig(level=logging.INFO)
         print("Starting Thalex Quoter Bot in VERBOSE mode...")
@@ -544,8 +710,8 @@ async def main():
     quoter = None
     while True:  # Outer retry loop
         try:
-            tlx = thalex.Thalex(network=cfg.network)
-            quoter = Quoter(tlx, cfg.instrument, 0.0, verbose=verbose)
+            tlx = thalex.Thalex(network=cfg.boot.network)
+            quoter = Quoter(tlx, cfg.boot.instrument, 0.0, verbose=verbose)
             await quoter.quote()
         except KeyboardInterrupt:
             log.info("Quoter stopped by user")
@@ -560,6 +726,11 @@ async def main():
                     await quoter.websocket_handler.cleanup()
                 except Exception as e:
                     log.error(f"Error during final cleanup: {e}")
+                try:
+                    # Each restart builds a new Quoter, so release this one's CSV log file
+                    quoter.logger.close()
+                except Exception as e:
+                    log.error(f"Error closing CSV log: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(), loop_factory=event_loop_factory())
\ No newline at end of file
@@ -1,7 +1,6 @@
 import logging
 import time
-from typing import Optional, Any, Callable
-from datetime import datetime, timezone
+from typing import Optional, Any, Callable, List, Tuple
 
 from config import cfg
 from utils import calculate_fee_amount
@@ -9,8 +8,11 @@ from utils import calculate_fee_amount
 log = logging.getLogger(__name__)
 
 class NotificationHandler:
+    __slots__ = ("logger", "instrument_name", "on_orders_update", "on_position_update", "on_trade_update",
+                 "on_pnl_update", "on_ticker_update", "on_exchange_error", "_order_label", "_last_ts_sec", "_last_ts", "_dispatch")
+
     def __init__(self, logger, instrument_name: str, 
-                 on_order_update: Callable[[str, dict], None],
+                 on_orders_update: Callable[[List[Tuple[int, str, dict, Optional[float]]]], None],
                  on_position_update: Callable[[float], None],
                  on_trade_update: Callable[[], None],
                  on_pnl_update: Callable[[Optional[float], Optional[float]], None],
@@ -22,7 +24,8 @@ class NotificationHandler:
         Args:
             logger: Logger instance for logging notifications
             instrument_name: The instrument being traded
-            on_order_update: Callback when order status changes
+            on_orders_update: Callback when order statuses change, called once per notification with
+                a list of (client_order_id, status, order, fee_amount); fee_amount is only set for fills
             on_position_update: Callback when position changes
             on_trade_update: Callback when trades occur
             on_pnl_update: Callback when PnL values change
@@ -31,113 +34,131 @@ class NotificationHandler:
         """
         self.logger = logger
         self.instrument_name = instrument_name
-        self.on_order_update = on_order_update
+        self.on_orders_update = on_orders_update
         self.on_position_update = on_position_update
         self.on_trade_update = on_trade_update
         self.on_pnl_update = on_pnl_update
         self.on_ticker_update = on_ticker_update
         self.on_exchange_error = on_exchange_error
+        self._order_label = cfg.boot.order_label
+
+        # Ticker log timestamp, reformatted only when the second changes
+        self._last_ts_sec = 0
+        self._last_ts = ""
+
+        # Channel name -> handler
+        self._dispatch = {
+            "session.orders": self._handle_orders_update,
+            "account.portfolio": self._handle_portfolio_update,
+            "trades": self._handle_trades_update,
+            "account.summary": self._handle_account_summary,
+            "ticker": self._handle_ticker_update,
+            "error": self.on_exchange_error,
+        }
 
-    async def handle_notification(self, channel: str, notification: Any):
+    def handle_notification(self, channel: str, notification: Any):
         """Handle incoming websocket notifications"""
         self.logger.log_notification(channel, notification)
         
-        if channel == "session.orders":
-            await self._handle_orders_update(notification)
-        elif channel == "account.portfolio":
-            await self._handle_portfolio_update(notification)
-        elif channel == "trades":
-            await self._handle_trades_update(notification)
-        elif channel == "account.summary":
-            await self._handle_account_summary(notification)
-        elif channel == "ticker":
-            await self._handle_ticker_update(notification)
-        elif channel == "error":
-            await self.on_exchange_error(notification)
+        handler = self._dispatch.get(channel)
+        if handler is not None:
+            handler(notification)
         else:
             self.logger.log_unknown_notification(channel, notification)
 
-    async def _handle_orders_update(self, notification: list):
+    def _handle_orders_update(self, notification: list):
         """Handle session.orders channel updates"""
         self.logger.log_orders_update(notification)
         
+        updates = []
         for order in notification:
             cid = order.get("client_order_id")
             status = order.get("status")
             self.logger.log_order_status(cid, status, order)
             
             # Debug: Log all order status updates
-            log.debug(f"[ORDER_UPDATE] Order {cid}: status='{status}', order={order}")
+            log.debug("[ORDER_UPDATE] Order %s: status='%s', order=%s", cid, status, order)
             
             if cid:
                 # Calculate fee impact for fills
                 if status == "filled":
-                    current_time = time.time()
-                    fee_amount = calculate_fee_amount(order.get("amount", 0), order.get("price", 0))
+                    amount = order.get("amount", 0)
+                    price = order.get("price", 0)
                     
-                    # Call the order update callback with fill information
-                    self.on_order_update(str(cid), {
-                        "status": status,
-                        "order": order,
-                        "fill_time": current_time,
-                        "fee_amount": fee_amount
-                    })
+                    # Queue the update with fill information
+                    updates.append((cid, status, order, calculate_fee_amount(amount, price)))
                 else:
-                    # Call the order update callback for non-fill updates
-                    self.on_order_update(str(cid), {
-                        "status": status,
-                        "order": order
-                    })
+                    # Queue the non-fill update
+                    updates.append((cid, status, order, None))
                 
                 # Log any status changes for debugging
                 if status in ["cancelled", "rejected"]:
                     log.info(f"Order {cid} {status}")
 
-    async def _handle_portfolio_update(self, notification: list):
+        # Hand the whole batch over in one call
+        if updates:
+            self.on_orders_update(updates)
+
+    def _handle_portfolio_update(self, notification: list):
         """Handle account.portfolio channel updates"""
         self.logger.log_portfolio_update(notification)
         
-        try:
-            position = next(p for p in notification if p["instrument_name"] == self.instrument_name)["position"]
-            self.logger.log_position_update(position)
-            self.on_position_update(position)
-        except StopIteration:
+        name = self.instrument_name
+        for p in notification:
+            if p["instrument_name"] == name:
+                position = p["position"]
+                self.logger.log_position_update(position)
+                self.on_position_update(position)
+                break
+        else:
             # No position found for this instrument, keep current position
             self.logger.log_warning(f"[POSITION_NOT_FOUND] No position found for {self.instrument_name}")
             # Don't call on_position_update since we don't have a new position
 
-    async def _handle_trades_update(self, notification: dict):
+    def _handle_trades_update(self, notification: dict):
         """Handle trades channel updates"""
         self.logger.log_trades_update(notification)
         
+        name = self.instrument_name
+        label = self._order_label
         for trade in notification.get("trades", []):
-            if trade["instrument"] == self.instrument_name and trade["label"] == cfg.order_label:
-                # Call the trade update callback
-                self.on_trade_update()
-                break
+            if trade.get("instrument") != name or trade.get("label") != label:
+                continue
+            # Call the trade update callback
+            self.on_trade_update()
+            break
 
-    async def _handle_account_summary(self, notification: dict):
+    def _handle_account_summary(self, notification: dict):
         """Handle account.summary channel updates"""
         self.logger.log_account_summary(notification)
         
-        if isinstance(notification, dict) and "result" in notification:
+        # Summaries always arrive as {"result": {...}}
+        try:
             result = notification["result"]
-            unrealised_pnl = result.get("unrealised_pnl")
-            realised_pnl = result.get("session_realised_pnl")
-            
-            log.debug(f"Updated PnL values - Actual: {unrealised_pnl}, {realised_pnl}")
-            
-            # Call the PnL update callback
-            self.on_pnl_update(unrealised_pnl, realised_pnl)
+        except KeyError:
+            return
+        unrealised_pnl = result.get("unrealised_pnl")
+        realised_pnl = result.get("session_realised_pnl")
+        
+        log.debug("Updated PnL values - Actual: %s, %s", unrealised_pnl, realised_pnl)
+        
+        # Call the PnL update callback
+        self.on_pnl_update(unrealised_pnl, realised_pnl)
 
-    async def _handle_ticker_update(self, notification: dict):
+    def _handle_ticker_update(self, notification: dict):
         """Handle ticker channel updates"""
-        if isinstance(notification, dict) and "best_bid_price" in notification and "best_ask_price" in notification:
-            best_bid = notification["best_bid_price"]
-            best_ask = notification["best_ask_price"]
-            mid_price = (best_bid + best_ask) / 2
-            
-            self.logger.log_ticker(datetime.now(timezone.utc).strftime('%d/%m/%y %H:%M:%S'), mid_price)
-            
-            # Call the ticker update callback
-            self.on_ticker_update(mid_price, best_bid, best_ask) 
\ No newline at end of file
+        # Ticker payloads are always dicts; a side is missing or None when that side of the book is empty
+        best_bid = notification.get("best_bid_price")
+        best_ask = notification.get("best_ask_price")
+        if best_bid is None or best_ask is None:
+            return
+        mid_price = (best_bid + best_ask) * 0.5
+        
+        now = int(time.time())
+        if now != self._last_ts_sec:
+            self._last_ts_sec = now
+            self._last_ts = time.strftime('%d/%m/%y %H:%M:%S', time.gmtime(now))
+        self.logger.log_ticker(self._last_ts, mid_price)
+        
+        # Call the ticker update callback
+        self.on_ticker_update(mid_price, best_bid, best_ask) 
\ No newline at end of file
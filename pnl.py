@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
 
-import json
+import asyncio
 import logging
 import os
 import sys
-import jwt
 import time
-import requests
+import httpx
+import orjson
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 # Add thalex-perp directory to Python path
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,53 +17,54 @@ sys.path.append(thalex_perp_dir)
 
 import thalex
 from thalex.thalex import Network
-import keys  # Now this will import from thalex-perp/keys.py
+import credentials
 from config import cfg
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_auth_token(key_id: str, private_key: str) -> str:
-    """Generate JWT token for authentication"""
-    return jwt.encode(
-        {"iat": time.time()},
-        private_key,
-        algorithm="RS512",
-        headers={"kid": key_id},
-    )
+# Signed tokens are reused until shortly before they expire
+_TOKEN_TTL = 300.0  # seconds, written to the token's exp claim
+_TOKEN_REFRESH_MARGIN = 30.0  # re-sign this long before exp
+_TOKEN_CACHE: Dict[Network, Tuple[str, float]] = {}  # network -> (token, exp)
 
-def get_pnl() -> Optional[Tuple[float, float]]:
+def get_auth_token(network: Network) -> str:
+    """Return a JWT for authentication, signing a new one only when the cached one is about to expire"""
+    now = time.time()
+    cached = _TOKEN_CACHE.get(network)
+    if cached is not None and now < cached[1] - _TOKEN_REFRESH_MARGIN:
+        return cached[0]
+    exp = now + _TOKEN_TTL
+    token = credentials.sign_jwt(network, {"iat": now, "exp": exp})
+    _TOKEN_CACHE[network] = (token, exp)
+    return token
+
+# Account summary endpoint for the configured network
+if cfg.boot.network == Network.TEST:
+    ACCOUNT_SUMMARY_URL = "https://testnet.thalex.com/api/v2/private/account_summary"
+else:
+    ACCOUNT_SUMMARY_URL = "https://thalex.com/api/v2/private/account_summary"
+
+# Shared client so connections (and the TLS session) are kept alive between polls
+_client = httpx.AsyncClient(http2=True, timeout=5.0, headers={"Content-Type": "application/json"})
+
+async def get_pnl() -> Optional[Tuple[float, float]]:
     """
     Get both unrealised and realised PnL values from account summary endpoint
     
     Returns:
         Tuple of (unrealised_pnl, realised_pnl) if successful, None if there was an error
     """
-    # Get authentication credentials from config
-    network = cfg.network
-    key_id = keys.key_ids[network]
-    private_key = keys.private_keys[network]
-    
     # Generate auth token
-    token = get_auth_token(key_id, private_key)
-    
-    # Set up headers
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+    token = get_auth_token(cfg.boot.network)
     
     # Make request to account summary endpoint
-    if network == Network.TEST:
-        url = "https://testnet.thalex.com/api/v2/private/account_summary"
-    else:
-        url = "https://thalex.com/api/v2/private/account_summary"
     try:
-        response = requests.get(url, headers=headers)
+        response = await _client.get(ACCOUNT_SUMMARY_URL, headers={"Authorization": f"Bearer {token}"})
         response.raise_for_status()  # Raise exception for non-200 status codes
         
-        data = response.json()
+        data = orjson.loads(response.content)
         if "result" in data:
             result = data["result"]
             unrealised_pnl = result.get("unrealised_pnl", 0)
@@ -79,17 +80,23 @@ def get_pnl() -> Optional[Tuple[float, float]]:
             logger.error(f"Unexpected response format: {data}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error making request: {e}")
         return None
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding response: {e}")
         return None
 
-if __name__ == "__main__":
-    # Example usage when run as script
-    result = get_pnl()
+async def _main():
+    try:
+        result = await get_pnl()
+    finally:
+        await _client.aclose()
     if result:
         unrealised, realised = result
         print(f"Unrealised PnL: {unrealised:.2f}")
-        print(f"Realised PnL: {realised:.2f}") 
\ No newline at end of file
+        print(f"Realised PnL: {realised:.2f}")
+
+if __name__ == "__main__":
+    # Example usage when run as script
+    asyncio.run(_main()) 
\ No newline at end of file
@@ -1,5 +1,9 @@
+import atexit
 import csv
+import io
 import logging
+import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
@@ -9,12 +13,31 @@ from config import cfg
 # Module-level logger
 log = logging.getLogger(__name__)
 
+# CSV rows are batched in memory and written to disk every this many rows, or as soon as a
+# row arrives this many seconds after the last write (so every row at the default log_interval)
+CSV_FLUSH_ROWS = 16
+CSV_FLUSH_SECS = 5.0
+
+# Data row layout; fields are plain numbers or the timestamp, so no CSV quoting is needed.
+# Same line terminator as csv.writer uses for the header section.
+ROW_FMT = "{},{},{},{},{},{},{},{},{},{}\r\n"
+
+def _f(value) -> str:
+    """Format an optional CSV field, None becomes an empty cell"""
+    return "" if value is None else format(value, "")
+
 class QuoterLogger:
     """Dedicated logging class for the Thalex Quoter Bot"""
     
     def __init__(self, verbose: bool = True):
         self.verbose = verbose
+        # Verbose mode reports message traffic at INFO, quiet mode only at DEBUG
+        self._level = logging.INFO if verbose else logging.DEBUG
         self.log_path = None
+        self._fd = None
+        self._pending = bytearray()
+        self._unflushed_rows = 0
+        self._last_flush = time.monotonic()
         self.setup_csv_logging()
     
     def setup_csv_logging(self):
@@ -26,171 +49,142 @@ class QuoterLogger:
         # Create csv_logs directory if it doesn't exist
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write parameter header and data columns
-        with self.log_path.open("w", newline="") as f:
-            writer = csv.writer(f)
-            # Write parameter section
-            writer.writerow(["Parameter", "Value"])
-            writer.writerow(["instrument", cfg.instrument])
-            writer.writerow(["network", cfg.network.name])
-            writer.writerow(["min_spread_bps", cfg.min_spread_bps])
-            writer.writerow(["max_spread_bps", cfg.max_spread_bps])
-            writer.writerow(["volatility_multiplier", cfg.volatility_multiplier])
-            writer.writerow(["bid_fill_cooldown", cfg.bid_fill_cooldown])
-            writer.writerow(["ask_fill_cooldown", cfg.ask_fill_cooldown])
-            writer.writerow(["bid_fill_recovery", cfg.bid_fill_recovery])
-            writer.writerow(["ask_fill_recovery", cfg.ask_fill_recovery])
-            writer.writerow(["recovery_spread_multiplier", cfg.recovery_spread_multiplier])
-            writer.writerow(["amend_threshold", cfg.amend_threshold])
-            writer.writerow(["base_size", cfg.size])
-            writer.writerow(["max_position", cfg.max_position])
-            writer.writerow(["volatility_update_interval", cfg.volatility_update_interval])
-            writer.writerow(["log_interval", cfg.log_interval])
-            writer.writerow(["fee_rate_bps", cfg.fee_rate_bps])
-            writer.writerow(["start_time", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")])
-            writer.writerow([])  # Empty row as separator
-            # Write data header
-            writer.writerow([
-                "timestamp", "mid_price", "position", "bid_spread", "ask_spread",
-                "unrealised_pnl", "realised_pnl", "total_fees_paid",
-                "volatility", "size_scale"
-            ])
+        # The file stays open for the whole session; rows bypass the text IO layer
+        self._fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        atexit.register(self.close)
+
+        # The header section is written once through csv.writer for proper quoting
+        header = io.StringIO(newline="")
+        writer = csv.writer(header)
+
+        # Write parameter section
+        writer.writerow(["Parameter", "Value"])
+        writer.writerow(["instrument", cfg.boot.instrument])
+        writer.writerow(["network", cfg.boot.network.name])
+        writer.writerow(["min_spread_bps", cfg.rt.min_spread_bps])
+        writer.writerow(["max_spread_bps", cfg.rt.max_spread_bps])
+        writer.writerow(["volatility_multiplier", cfg.rt.volatility_multiplier])
+        writer.writerow(["bid_fill_cooldown", cfg.rt.timing.bid_fill_cooldown])
+        writer.writerow(["ask_fill_cooldown", cfg.rt.timing.ask_fill_cooldown])
+        writer.writerow(["bid_fill_recovery", cfg.rt.timing.bid_fill_recovery])
+        writer.writerow(["ask_fill_recovery", cfg.rt.timing.ask_fill_recovery])
+        writer.writerow(["recovery_spread_multiplier", cfg.rt.timing.recovery_spread_multiplier])
+        writer.writerow(["amend_threshold", cfg.rt.amend_threshold])
+        writer.writerow(["base_size", cfg.rt.size])
+        writer.writerow(["max_position", cfg.rt.max_position])
+        writer.writerow(["volatility_update_interval", cfg.rt.timing.volatility_update_interval])
+        writer.writerow(["log_interval", cfg.rt.timing.log_interval])
+        writer.writerow(["quote_refresh_interval", cfg.rt.timing.quote_refresh_interval])
+        writer.writerow(["fee_rate_bps", cfg.rt.fee_rate_bps])
+        writer.writerow(["start_time", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")])
+        writer.writerow([])  # Empty row as separator
+        # Write data header
+        writer.writerow([
+            "timestamp", "mid_price", "position", "bid_spread", "ask_spread",
+            "unrealised_pnl", "realised_pnl", "total_fees_paid",
+            "volatility", "size_scale"
+        ])
+        self._pending += header.getvalue().encode()
+        self.flush()
+    
+    def traffic_enabled(self) -> bool:
+        """Whether the message traffic log_* methods currently emit anything"""
+        return log.isEnabledFor(self._level)
     
     def log_websocket_message(self, msg):
         """Log websocket messages based on verbose mode"""
-        if self.verbose:
-            log.info(f"[WEBSOCKET_RECEIVED] Raw message: {msg}")
-        else:
-            log.debug(f"[WEBSOCKET_RECEIVED] Raw message: {msg}")
+        log.log(self._level, "[WEBSOCKET_RECEIVED] Raw message: %s", msg)
     
     def log_notification(self, channel: str, notification):
         """Log notification messages based on verbose mode"""
-        if self.verbose:
-            log.info(f"[HANDLE_NOTIFICATION] channel={channel}, notification={notification}")
-        else:
-            log.debug(f"[HANDLE_NOTIFICATION] channel={channel}, notification={notification}")
+        log.log(self._level, "[HANDLE_NOTIFICATION] channel=%s, notification=%s", channel, notification)
     
     def log_orders_update(self, notification):
         """Log order updates based on verbose mode"""
-        if self.verbose:
-            log.info(f"[ORDERS_UPDATE] Received {len(notification)} order updates: {notification}")
-        else:
-            log.debug(f"[ORDERS_UPDATE] Received {len(notification)} order updates")
+        log.log(self._level, "[ORDERS_UPDATE] Received %d order updates: %s", len(notification), notification)
     
     def log_order_status(self, cid, status, order=None):
         """Log individual order status based on verbose mode"""
-        if self.verbose:
-            log.info(f"[ORDER_STATUS] client_order_id={cid}, status={status}, order={order}")
-        else:
-            log.debug(f"[ORDER_STATUS] client_order_id={cid}, status={status}")
+        log.log(self._level, "[ORDER_STATUS] client_order_id=%s, status=%s, order=%s", cid, status, order)
     
     def log_portfolio_update(self, notification):
         """Log portfolio updates based on verbose mode"""
-        if self.verbose:
-            log.info(f"[PORTFOLIO_UPDATE] Received portfolio update: {notification}")
-        else:
-            log.debug(f"[PORTFOLIO_UPDATE] Received portfolio update")
+        log.log(self._level, "[PORTFOLIO_UPDATE] Received portfolio update: %s", notification)
     
     def log_position_update(self, position):
         """Log position updates based on verbose mode"""
-        if self.verbose:
-            log.info(f"[POSITION_UPDATE] Position updated to: {position}")
-        else:
-            log.debug(f"[POSITION_UPDATE] Position updated to: {position}")
+        log.log(self._level, "[POSITION_UPDATE] Position updated to: %s", position)
     
     def log_trades_update(self, notification):
         """Log trades updates based on verbose mode"""
-        if self.verbose:
-            log.info(f"[TRADES_UPDATE] Received trades update: {notification}")
-        else:
-            log.debug(f"[TRADES_UPDATE] Received trades update")
+        log.log(self._level, "[TRADES_UPDATE] Received trades update: %s", notification)
     
     def log_account_summary(self, notification):
         """Log account summary updates based on verbose mode"""
-        if self.verbose:
-            log.info(f"[ACCOUNT_SUMMARY] Received account summary: {notification}")
-        else:
-            log.debug(f"[ACCOUNT_SUMMARY] Received account summary")
+        log.log(self._level, "[ACCOUNT_SUMMARY] Received account summary: %s", notification)
     
     def log_adjust_order(self, side, price, amount, client_order_id, is_open, confirmed=None):
         """Log order adjustment attempts based on verbose mode"""
-        if self.verbose:
-            log.info(f"[ADJUST_ORDER] side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, is_open={is_open}, confirmed={confirmed}")
-        else:
-            log.debug(f"[ADJUST_ORDER] side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, is_open={is_open}")
+        log.log(self._level, "[ADJUST_ORDER] side=%s, price=%s, amount=%s, client_order_id=%s, is_open=%s, confirmed=%s",
+                side, price, amount, client_order_id, is_open, confirmed)
     
     def log_amend_attempt(self, client_order_id, side, amount, price):
         """Log amend attempts based on verbose mode"""
-        if self.verbose:
-            log.info(f"[AMEND_ATTEMPT] Amending order {client_order_id} for {side}: {amount:g} @ {price:.2f}")
-        else:
-            log.debug(f"[AMEND_ATTEMPT] Amending order {client_order_id} for {side}: {amount:g} @ {price:.2f}")
+        log.log(self._level, "[AMEND_ATTEMPT] Amending order %s for %s: %g @ %.2f", client_order_id, side, amount, price)
     
     def log_amend_success(self, client_order_id):
         """Log successful amends based on verbose mode"""
-        if self.verbose:
-            log.info(f"[AMEND_SUCCESS] Order {client_order_id} amended successfully")
-        else:
-            log.debug(f"[AMEND_SUCCESS] Order {client_order_id} amended successfully")
+        log.log(self._level, "[AMEND_SUCCESS] Order %s amended successfully", client_order_id)
     
     def log_insert_attempt(self, side, price, amount, client_order_id, instrument_name):
         """Log insert attempts based on verbose mode"""
-        if self.verbose:
-            log.info(f"[INSERT_ATTEMPT] side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, instrument={instrument_name}")
-        else:
-            log.debug(f"[INSERT_ATTEMPT] side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, instrument={instrument_name}")
+        log.log(self._level, "[INSERT_ATTEMPT] side=%s, price=%s, amount=%s, client_order_id=%s, instrument=%s",
+                side, price, amount, client_order_id, instrument_name)
     
     def log_insert_success(self, client_order_id, side, amount, price):
         """Log successful inserts based on verbose mode"""
-        if self.verbose:
-            log.info(f"[INSERT_SUCCESS] Order inserted: {client_order_id} for {side} {amount:g} @ {price:.2f}")
-        else:
-            log.debug(f"[INSERT_SUCCESS] Order inserted: {client_order_id} for {side} {amount:g} @ {price:.2f}")
+        log.log(self._level, "[INSERT_SUCCESS] Order inserted: %s for %s %g @ %.2f", client_order_id, side, amount, price)
     
     def log_no_insert(self, side, price, amount, client_order_id, is_open):
         """Log when orders are not inserted based on verbose mode"""
-        if self.verbose:
-            log.info(f"[NO_INSERT] Not inserting order: side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, is_open={is_open}")
-        else:
-            log.debug(f"[NO_INSERT] Not inserting order: side={side}, price={price}, amount={amount}, client_order_id={client_order_id}, is_open={is_open}")
+        log.log(self._level, "[NO_INSERT] Not inserting order: side=%s, price=%s, amount=%s, client_order_id=%s, is_open=%s",
+                side, price, amount, client_order_id, is_open)
     
     def log_result(self, result):
         """Log API results based on verbose mode"""
-        if self.verbose:
-            log.info(f"[RESULT] Received result: {result}")
-        else:
-            log.debug(f"[RESULT] Received result")
+        log.log(self._level, "[RESULT] Received result: %s", result)
     
     def log_unknown_message(self, msg):
         """Log unknown message formats based on verbose mode"""
-        if self.verbose:
-            log.info(f"[UNKNOWN_MSG] Unknown message format: {msg}")
-        else:
-            log.debug(f"[UNKNOWN_MSG] Unknown message format: {msg}")
+        log.log(self._level, "[UNKNOWN_MSG] Unknown message format: %s", msg)
+    
+    def log_unknown_notification(self, channel: str, notification):
+        """Log notifications on channels without a handler based on verbose mode"""
+        log.log(self._level, "[UNKNOWN_NOTIFICATION] channel=%s, notification=%s", channel, notification)
     
     def log_connection_test(self, message: str):
         """Log connection test messages"""
-        log.info(f"[CONNECTION_TEST] {message}")
+        log.info("[CONNECTION_TEST] %s", message)
     
     def log_connection(self, message: str):
         """Log connection messages"""
-        log.info(f"[CONNECTION] {message}")
+        log.info("[CONNECTION] %s", message)
     
     def log_auth(self, message: str):
         """Log authentication messages"""
-        log.info(f"[AUTH] {message}")
+        log.info("[AUTH] %s", message)
     
     def log_subscription(self, message: str):
         """Log subscription messages"""
-        log.info(f"[SUBSCRIPTION] {message}")
+        log.info("[SUBSCRIPTION] %s", message)
     
     def log_test(self, message: str):
         """Log test messages"""
-        log.info(f"[TEST] {message}")
+        log.info("[TEST] %s", message)
     
     def log_ticker(self, timestamp: str, mid_price: float):
         """Log ticker updates"""
-        log.info(f"[TICKER] {timestamp} Mid = {mid_price:.2f}")
+        log.info("[TICKER] %s Mid = %.2f", timestamp, mid_price)
     
     def log_error(self, message: str, exc_info: bool = False):
         """Log error messages"""
@@ -214,22 +208,36 @@ class QuoterLogger:
                      total_fees_paid: float, current_volatility: Optional[float], size_scale: float):
         """Write data to CSV log file"""
         try:
-            with self.log_path.open("a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    timestamp,
-                    mid if mid is not None else "",
-                    position if position is not None else "",
-                    last_bid_spread if last_bid_spread is not None else "",
-                    last_ask_spread if last_ask_spread is not None else "",
-                    unrealised_pnl if unrealised_pnl is not None else "",
-                    realised_pnl if realised_pnl is not None else "",
-                    total_fees_paid,
-                    current_volatility if current_volatility is not None else "",
-                    size_scale
-                ])
+            self._pending += ROW_FMT.format(
+                timestamp, _f(mid), _f(position), _f(last_bid_spread), _f(last_ask_spread),
+                _f(unrealised_pnl), _f(realised_pnl), total_fees_paid, _f(current_volatility), size_scale
+            ).encode("ascii")
+            self._unflushed_rows += 1
+            if self._unflushed_rows >= CSV_FLUSH_ROWS or time.monotonic() - self._last_flush >= CSV_FLUSH_SECS:
+                self.flush()
         except Exception as e:
             log.error(f"Error writing to CSV log: {e}")
+
+    def flush(self):
+        """Push batched CSV rows to disk; on a write error the unwritten rows are dropped"""
+        # Take the batch first, so a failed write cannot leave it to grow without bound
+        view = memoryview(bytes(self._pending))
+        self._pending.clear()
+        self._unflushed_rows = 0
+        self._last_flush = time.monotonic()
+        while view:
+            # os.write may write only part of the buffer
+            view = view[os.write(self._fd, view):]
+
+    def close(self):
+        """Flush and close the CSV log file; safe to call more than once"""
+        if self._fd is not None:
+            atexit.unregister(self.close)
+            try:
+                self.flush()
+            finally:
+                os.close(self._fd)
+                self._fd = None
     
     def log_state_summary(self, current_volatility: Optional[float], mid: Optional[float], 
                          position: Optional[float], last_bid_spread: Optional[float], 
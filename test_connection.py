@@ -13,8 +13,9 @@ sys.path.insert(0, '.')
 
 import thalex
 from thalex.thalex import Network
-from keys import key_ids, private_keys
+from credentials import key_id, get_signing_key
 from config import cfg
+from utils import event_loop_factory
 
 # Set up logging
 logging.basicConfig(
@@ -29,8 +30,8 @@ async def test_connection():
     
     try:
         # Create Thalex instance
-        log.info(f"Creating Thalex instance for network: {cfg.network}")
-        tlx = thalex.Thalex(network=cfg.network)
+        log.info(f"Creating Thalex instance for network: {cfg.boot.network}")
+        tlx = thalex.Thalex(network=cfg.boot.network)
         
         # Test connection
         log.info("Testing WebSocket connection...")
@@ -46,7 +47,7 @@ async def test_connection():
         
         # Test authentication
         log.info("Testing authentication...")
-        await tlx.login(key_ids[cfg.network], private_keys[cfg.network])
+        await tlx.login(key_id(cfg.boot.network), get_signing_key(cfg.boot.network))
         log.info("✓ Authentication successful")
         
         # Wait for any authentication response
@@ -89,11 +90,11 @@ async def test_continuous_connection():
     log.info("Starting continuous connection test...")
     
     try:
-        tlx = thalex.Thalex(network=cfg.network)
+        tlx = thalex.Thalex(network=cfg.boot.network)
         
         # Connect and authenticate
         await tlx.connect()
-        await tlx.login(key_ids[cfg.network], private_keys[cfg.network])
+        await tlx.login(key_id(cfg.boot.network), get_signing_key(cfg.boot.network))
         
         log.info("Starting continuous message reception (30 seconds)...")
         start_time = time.time()
@@ -124,7 +125,7 @@ if __name__ == "__main__":
     print("=" * 40)
     
     # Run basic connection test
-    success = asyncio.run(test_connection())
+    success = asyncio.run(test_connection(), loop_factory=event_loop_factory())
     
     if success:
         print("\nBasic connection test PASSED")
@@ -132,7 +133,7 @@ if __name__ == "__main__":
         # Ask if user wants to run continuous test
         response = input("\nRun continuous connection test? (y/n): ")
         if response.lower() == 'y':
-            asyncio.run(test_continuous_connection())
+            asyncio.run(test_continuous_connection(), loop_factory=event_loop_factory())
     else:
         print("\nBasic connection test FAILED")
         sys.exit(1) 
\ No newline at end of file
@@ -1,8 +1,8 @@
 import enum
-import json
 import logging
 
 import jwt
+import orjson
 import time
 from typing import Optional, List, Union
 
@@ -134,11 +134,12 @@ class Thalex:
         self.net: Network = network
         self.ws: websockets.client = None
 
-    async def receive(self):
+    async def receive(self) -> bytes:
+        """Next message as the frame's raw bytes; text frames are not decoded to str, parse them with orjson."""
         try:
             if not self.connection_healthy():
                 raise websockets.exceptions.ConnectionClosedError(None, None, "Connection not healthy")
-            return await self.ws.recv()
+            return await self.ws.recv(decode=False)
         except websockets.exceptions.ConnectionClosedError as e:
             logging.error(f"WebSocket connection closed during receive: {e}")
             raise
@@ -168,17 +169,19 @@ class Thalex:
         except Exception:
             return False
 
-    async def connect(self):
+    async def connect(self, **kwargs):
+        """Open the websocket; kwargs are passed to websockets.connect and override the defaults below."""
+        options = dict(
+            ping_interval=30,  # Send ping every 30 seconds
+            ping_timeout=10,   # Wait 10 seconds for pong response
+            close_timeout=10,  # Wait 10 seconds for close frame
+            max_size=2**20,    # 1MB max message size
+            max_queue=16,      # Buffer at most 16 unread frames, then stop reading the socket (TCP backpressure)
+            compression=None   # Disable compression for better reliability
+        )
+        options.update(kwargs)
         try:
-            # Add more robust WebSocket connection parameters
-            self.ws = await websockets.connect(
-                self.net.value, 
-                ping_interval=30,  # Send ping every 30 seconds
-                ping_timeout=10,   # Wait 10 seconds for pong response
-                close_timeout=10,  # Wait 10 seconds for close frame
-                max_size=2**20,    # 1MB max message size
-                compression=None   # Disable compression for better reliability
-            )
+            self.ws = await websockets.connect(self.net.value, **options)
         except Exception as e:
             logging.error(f"Failed to connect to {self.net.value}: {e}")
             raise
@@ -193,8 +196,13 @@ class Thalex:
         for key, value in kwargs.items():
             if value is not None:
                 request["params"][key] = value
-        request = json.dumps(request)
-        logging.debug(f"Sending {request=}")
+        request = orjson.dumps(request).decode()
+        logging.debug("Sending request=%r", request)
+        await self.ws.send(request)
+
+    async def send_raw(self, request: str):
+        """Send an already serialized request frame as is."""
+        logging.debug("Sending request=%r", request)
         await self.ws.send(request)
 
     async def login(
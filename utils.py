@@ -1,27 +1,33 @@
 import logging
-from typing import Optional
-from config import cfg
+import sys
+from typing import Callable, Optional
+from config import FEE_FRAC
 
 # Module-level logger
 log = logging.getLogger(__name__)
 
 
-def round_to_tick(value: float) -> float:
-    """Round a price value to the nearest tick size."""
-    return cfg.price_tick * round(value / cfg.price_tick)
-
-
-def round_size(size: float) -> float:
-    """Round a size value to the nearest size tick."""
-    return cfg.size_tick * round(size / cfg.size_tick)
-
-
 def calculate_fee_amount(amount: float, price: float) -> float:
     """Calculate the fee amount for a trade."""
-    fee_rate = cfg.fee_rate_bps / 10000  # Convert bps to decimal
-    return abs(amount * price * fee_rate)
+    return abs(amount * price * FEE_FRAC)
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
     """Clamp a value between min and max."""
-    return max(min(value, max_val), min_val) 
\ No newline at end of file
+    if value < min_val:
+        return min_val
+    if value > max_val:
+        return max_val
+    return value
+
+
+def event_loop_factory() -> Optional[Callable]:
+    """Return uvloop's loop factory when available, else None for the default asyncio loop."""
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        log.debug("uvloop not installed, using the default asyncio event loop")
+        return None
+    return uvloop.new_event_loop
@@ -1,8 +1,10 @@
-import json
+import asyncio
+import bisect
 import logging
-import requests
 import time
-from typing import Optional, Dict, List, Tuple
+import httpx
+import orjson
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timezone
 
 # Configure logging
@@ -18,125 +20,220 @@ INSTRUMENTS_URL = f"{BASE_URL}/public/all_instruments"
 INDEX_PRICE_URL = f"{BASE_URL}/public/index"
 TICKER_URL = f"{BASE_URL}/public/ticker"
 
-def get_atm_volatility(network: str = "test") -> Optional[float]:
+# Shared client so the REST calls of a poll are multiplexed over one kept-alive HTTP/2 connection.
+# The transport retries failed connection attempts; HTTP error statuses are handled below.
+# Pool settings go on the transport, the client ignores its own when given one.
+_client = httpx.AsyncClient(
+    timeout=5.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        retries=3,
+    ),
+)
+
+class _RateLimiter:
+    """
+    Spaces out REST calls with an AIMD controlled delay.
+    Throttling (429) and server errors double the delay, every successful
+    response eases it back by a fixed step, and a Retry-After header pauses
+    all calls for as long as the server asks.
+    """
+    def __init__(self, base_delay: float = 0.25, max_delay: float = 8.0, step: float = 0.125):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.delay = 0.0
+        self._next_at = 0.0
+
+    async def wait(self):
+        """Sleep until the next call is allowed and reserve its slot"""
+        now = time.monotonic()
+        if now < self._next_at:
+            await asyncio.sleep(self._next_at - now)
+            now = time.monotonic()
+        self._next_at = now + self.delay
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """Multiplicative increase of the delay, plus an optional server-requested pause"""
+        self.delay = min(self.max_delay, max(self.delay * 2, self.base_delay))
+        pause = max(self.delay, retry_after or 0.0)
+        self._next_at = max(self._next_at, time.monotonic() + pause)
+
+    def record(self, response: httpx.Response):
+        """Adjust the delay from a response's status and Retry-After header"""
+        if response.status_code == 429 or response.status_code >= 500:
+            try:
+                retry_after = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                retry_after = None
+            self.backoff(retry_after)
+        else:
+            self.delay = max(0.0, self.delay - self.step)
+
+# Shared by the instruments, index and ticker calls
+_limiter = _RateLimiter()
+
+async def _get(url: str, params: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GET through the shared client, paced by the shared rate limiter"""
+    await _limiter.wait()
+    try:
+        response = await _client.get(url, params=params)
+    except httpx.TransportError:
+        _limiter.backoff()
+        raise
+    _limiter.record(response)
+    return response
+
+def _result(response: httpx.Response, what: str) -> Optional[Any]:
+    """Check the status, decode the body and return its 'result', or None (logged) if the body has none"""
+    response.raise_for_status()
+    try:
+        return orjson.loads(response.content)['result']
+    except (TypeError, KeyError):
+        logging.error(f"Invalid {what} response format")
+        return None
+
+# One side of an expiry's chain: ascending strikes and the instrument names at those strikes
+StrikeChain = Tuple[List[float], List[str]]
+
+# The option chain barely changes intra-day, so it is re-downloaded at most this often
+_INSTRUMENTS_TTL = 300.0  # seconds
+_OPTIONS_CACHE: Dict[str, Tuple[float, Dict[str, Tuple[StrikeChain, StrikeChain]]]] = {}  # underlying -> (fetched_at, chains by expiry)
+
+def _strike_chain(options: List[Dict]) -> StrikeChain:
+    """Sort options by strike into parallel strike and name lists; only these two fields are kept"""
+    pairs = sorted((float(o['strike_price']), o['instrument_name']) for o in options)
+    return [strike for strike, _ in pairs], [name for _, name in pairs]
+
+def _closest_strike(chain: StrikeChain, price: float) -> Optional[str]:
+    """Return the name of the option whose strike is nearest to price (the lower one on a tie)"""
+    strikes, names = chain
+    if not strikes:
+        return None
+    i = bisect.bisect_left(strikes, price)
+    if i == len(strikes) or (i > 0 and price - strikes[i - 1] <= strikes[i] - price):
+        i -= 1
+    return names[i]
+
+async def _fetch_options_by_expiry(underlying: str = "BTCUSD") -> Optional[Dict[str, Tuple[StrikeChain, StrikeChain]]]:
+    """Return the underlying's (calls, puts) strike chains by expiry date, downloading the instrument list only when the cached one is stale"""
+    now = time.monotonic()
+    cached = _OPTIONS_CACHE.get(underlying)
+    if cached is not None and now - cached[0] < _INSTRUMENTS_TTL:
+        return cached[1]
+
+    # Fetch instruments
+    logging.info("Fetching list of instruments...")
+    instruments = _result(await _get(INSTRUMENTS_URL), "instruments")
+    if instruments is None:
+        return None
+    if not isinstance(instruments, list):
+        logging.error("Instruments result is not a list")
+        return None
+        
+    logging.info(f"Successfully fetched {len(instruments)} instruments")
+    
+    # Filter options and group by expiry
+    options = [i for i in instruments if i.get('type') == 'option' and i.get('underlying') == underlying]
+    logging.info(f"Found {len(options)} option instruments")
+    
+    # Expired dates can never be the nearest expiry, so they are dropped here;
+    # YYYY-MM-DD strings order chronologically
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    options_by_expiry: Dict[str, List[Dict]] = {}
+    for opt in options:
+        expiry = opt.get('expiry_date')
+        if expiry and expiry > today:
+            if expiry not in options_by_expiry:
+                options_by_expiry[expiry] = []
+            options_by_expiry[expiry].append(opt)
+
+    # Strike-sorted calls and puts per expiry, so the ATM lookup is a bisection
+    chains = {
+        expiry: (_strike_chain([o for o in opts if o.get('option_type') == 'call']),
+                 _strike_chain([o for o in opts if o.get('option_type') == 'put']))
+        for expiry, opts in options_by_expiry.items()
+    }
+
+    _OPTIONS_CACHE[underlying] = (now, chains)
+    return chains
+
+async def _fetch_index_price(underlying: str = "BTCUSD") -> Optional[float]:
+    """Return the underlying's index price"""
+    logging.info(f"Fetching {underlying} index price...")
+    index = _result(await _get(INDEX_PRICE_URL, {"underlying": underlying}), "index price")
+    if index is None:
+        return None
+    return float(index['price'])
+
+async def get_atm_volatility(network: str = "test") -> Optional[float]:
     """
     Get the ATM volatility (average IV of the closest call and put) for the nearest expiry.
     Returns the average IV as a float, or None if not available.
     """
     try:
-        # Fetch instruments
-        logging.info("Fetching list of instruments...")
-        response = requests.get(INSTRUMENTS_URL)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not isinstance(data, dict) or 'result' not in data:
-            logging.error("Invalid instruments response format")
-            return None
-            
-        instruments = data['result']
-        if not isinstance(instruments, list):
-            logging.error("Instruments result is not a list")
-            return None
-            
-        logging.info(f"Successfully fetched {len(instruments)} instruments")
-        
-        # Fetch index price
-        logging.info("Fetching BTCUSD index price...")
-        response = requests.get(f"{INDEX_PRICE_URL}?underlying=BTCUSD")
-        response.raise_for_status()
-        data = response.json()
-        
-        if not isinstance(data, dict) or 'result' not in data:
-            logging.error("Invalid index price response format")
+        # Option chain, grouped by expiry (cached between polls), and the index price; independent, so fetched together
+        options_by_expiry, current_price = await asyncio.gather(
+            _fetch_options_by_expiry("BTCUSD"),
+            _fetch_index_price("BTCUSD"),
+        )
+        if options_by_expiry is None or current_price is None:
             return None
             
-        current_price = float(data['result']['price'])
         logging.info(f"Current BTCUSD price: ${current_price:,.2f}")
         
-        # Filter options and group by expiry
-        options = [i for i in instruments if i.get('type') == 'option' and i.get('underlying') == 'BTCUSD']
-        logging.info(f"Found {len(options)} option instruments")
-        
-        # Group options by expiry
-        options_by_expiry: Dict[str, List[Dict]] = {}
-        for opt in options:
-            expiry = opt.get('expiry_date')
-            if expiry:
-                if expiry not in options_by_expiry:
-                    options_by_expiry[expiry] = []
-                options_by_expiry[expiry].append(opt)
-        
-        # Filter and sort future expiries
-        now = datetime.now(timezone.utc)
-        future_expiries = [
-            expiry for expiry in options_by_expiry.keys()
-            if datetime.strptime(expiry, "%Y-%m-%d").replace(tzinfo=timezone.utc) > now
-        ]
-        sorted_expiries = sorted(future_expiries)
-        if not sorted_expiries:
+        # Nearest future expiry; the cache may predate a date rollover, so filter again
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        nearest_expiry = min((expiry for expiry in options_by_expiry if expiry > today), default=None)
+        if nearest_expiry is None:
             logging.error("No future option expiries found")
             return None
         
-        # Get nearest expiry options
-        nearest_expiry = sorted_expiries[0]
-        nearest_options = options_by_expiry[nearest_expiry]
+        # Get nearest expiry chains
+        calls, puts = options_by_expiry[nearest_expiry]
         
         # Find closest call and put
-        closest_call = None
-        closest_put = None
-        min_call_diff = float('inf')
-        min_put_diff = float('inf')
-        
-        for opt in nearest_options:
-            strike = float(opt['strike_price'])
-            diff = abs(strike - current_price)
-            
-            if opt['option_type'] == 'call' and diff < min_call_diff:
-                min_call_diff = diff
-                closest_call = opt
-            elif opt['option_type'] == 'put' and diff < min_put_diff:
-                min_put_diff = diff
-                closest_put = opt
+        call_name = _closest_strike(calls, current_price)
+        put_name = _closest_strike(puts, current_price)
         
-        if not closest_call or not closest_put:
+        if not call_name or not put_name:
             logging.error("Could not find closest call and put options")
             return None
         
-        logging.info(f"Closest call instrument_name: {closest_call['instrument_name']}")
-        logging.info(f"Closest put instrument_name: {closest_put['instrument_name']}")
+        logging.info(f"Closest call instrument_name: {call_name}")
+        logging.info(f"Closest put instrument_name: {put_name}")
         
         # Get tickers for closest options
-        def get_ticker(instrument_name: str) -> Optional[Dict]:
+        async def get_ticker(instrument_name: str) -> Optional[Dict]:
             try:
-                response = requests.get(f"{TICKER_URL}?instrument_name={instrument_name}")
-                response.raise_for_status()
-                data = response.json()
-                if isinstance(data, dict) and 'result' in data:
-                    return data['result']
-                return None
+                return _result(await _get(TICKER_URL, {"instrument_name": instrument_name}), "ticker")
             except Exception as e:
                 logging.error(f"Error fetching ticker for {instrument_name}: {e}")
                 return None
         
-        # Get tickers with retry logic
+        # Get tickers with retry logic; each retry backs off the shared limiter first,
+        # since failures other than 429/5xx/transport errors leave its delay unchanged
         max_retries = 3
-        retry_delay = 1  # seconds
         
         call_ticker = None
         put_ticker = None
         
-        for _ in range(max_retries):
-            call_ticker = get_ticker(closest_call['instrument_name'])
-            put_ticker = get_ticker(closest_put['instrument_name'])
+        for attempt in range(max_retries):
+            if attempt:
+                _limiter.backoff()
+            # Both tickers are requested concurrently; a retry only re-requests the side that failed
+            if not call_ticker and not put_ticker:
+                call_ticker, put_ticker = await asyncio.gather(get_ticker(call_name), get_ticker(put_name))
+            elif not call_ticker:
+                call_ticker = await get_ticker(call_name)
+            else:
+                put_ticker = await get_ticker(put_name)
             
             if call_ticker and put_ticker:
                 logging.info(f"Call ticker data: {call_ticker}")
                 logging.info(f"Put ticker data: {put_ticker}")
                 break
-                
-            time.sleep(retry_delay)
-            retry_delay *= 2
         
         if not call_ticker or not put_ticker:
             logging.error("Failed to get tickers for closest options")
@@ -157,16 +254,22 @@ def get_atm_volatility(network: str = "test") -> Optional[float]:
         
         return avg_iv
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logging.error(f"Error in get_atm_volatility: {e}")
         return None
     except Exception as e:
         logging.error(f"Unexpected error in get_atm_volatility: {e}")
         return None
 
-if __name__ == "__main__":
-    volatility = get_atm_volatility()
+async def _main():
+    try:
+        volatility = await get_atm_volatility()
+    finally:
+        await _client.aclose()
     if volatility is not None:
         print(f"ATM Volatility: {volatility:.2%}")
     else:
-        print("Failed to get ATM volatility") 
\ No newline at end of file
+        print("Failed to get ATM volatility")
+
+if __name__ == "__main__":
+    asyncio.run(_main()) 
\ No newline at end of file
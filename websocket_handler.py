@@ -1,33 +1,71 @@
 import asyncio
-import json
 import logging
+import orjson
+import random
 import websockets
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Dict, Tuple
+from websockets.protocol import State as WsState
 
 from thalex.thalex import Thalex, Network
-import keys
+import credentials
 from config import cfg
 from quoter_logger import QuoterLogger
 
 # Module-level logger
 log = logging.getLogger(__name__)
 
+# Websocket states in which the connection counts as live
+_LIVE_STATES = (WsState.CONNECTING, WsState.OPEN)
+
+# The receive loop yields to the event loop after this many messages, since recv()
+# returns buffered frames without suspending and a burst would starve other tasks
+YIELD_EVERY = 64
+
+# Reconnect backoff: full jitter over an exponentially growing, capped window
+BACKOFF_BASE = 2.0  # seconds
+MAX_BACKOFF = 30.0  # seconds
+
+def backoff_delay(attempt: int) -> float:
+    """Random delay before retry number attempt (0-based), uniform over [0, min(MAX_BACKOFF, BACKOFF_BASE * 2**attempt)]"""
+    return random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** attempt))
+
+# Request ids of the setup calls whose responses are waited for, and how long to wait
+LOGIN_ID = 1
+ACCOUNT_SUMMARY_ID = 2
+INSTRUMENT_ID = 3
+SETUP_TIMEOUT = 5.0  # seconds
+
+# The account summary is requested together with every this many ticker requests (~5s)
+ACCOUNT_SUMMARY_EVERY = 5
+
 class WebSocketHandler:
     """Dedicated websocket handler for managing connections and message processing"""
+
+    # Private channels subscribed to on every (re)connect
+    _SUBSCRIPTIONS = ("session.orders", "account.portfolio", "trades")
+    # Heartbeat after which the exchange cancels the session's orders if the connection drops
+    _CANCEL_ON_DISCONNECT_SECS = 6
     
-    def __init__(self, tlx: Thalex, logger: QuoterLogger, notification_handler: Callable):
+    def __init__(self, tlx: Thalex, logger: QuoterLogger, notification_handler: Callable,
+                 connect_kwargs: Optional[dict] = None):
         self.tlx = tlx
         self.logger = logger
         self.notification_handler = notification_handler
-        self.message_queue = asyncio.Queue()
-        self.receiver_task = None
+        # Extra websockets.connect options, e.g. max_size
+        self.connect_kwargs = connect_kwargs or {}
         self.is_running = False
         self.authenticated = asyncio.Event()  # Event to signal authentication status
+        self._ws_ref = None  # tlx.ws as of the last successful connect_and_authenticate
+
+        # Top-level key -> handler, in probing order; notifications are by far the most common
+        self._dispatch = {
+            "channel_name": self._handle_channel,
+            "result": self._handle_result,
+            "error": self._handle_error,
+        }
     
-    async def connect_and_authenticate(self):
-        """Connect to Thalex and authenticate"""
-        max_retries = 3
-        retry_delay = 2
+    async def connect_and_authenticate(self, max_retries: int = 3):
+        """Connect to Thalex and authenticate, making up to max_retries attempts with backoff in between"""
         
         for attempt in range(max_retries):
             try:
@@ -35,26 +73,28 @@ class WebSocketHandler:
                 
                 if not self.tlx.connected():
                     self.logger.log_connection("Connecting to Thalex...")
-                    await self.tlx.connect()
+                    await self.tlx.connect(**self.connect_kwargs)
                     self.logger.log_connection("Connected successfully")
                 else:
                     self.logger.log_connection("Already connected")
                 
-                # Wait a moment for connection to stabilize
-                await asyncio.sleep(1)
-                
                 self.logger.log_auth("Attempting login...")
-                await self.tlx.login(keys.key_ids[cfg.network], keys.private_keys[cfg.network])
+                await self.tlx.login(credentials.key_id(cfg.boot.network), credentials.get_signing_key(cfg.boot.network), id=LOGIN_ID)
+                # Wait for the login response itself rather than a fixed delay
+                response = (await self._await_responses((LOGIN_ID,)))[LOGIN_ID]
+                if "error" in response:
+                    raise RuntimeError(f"Login rejected: {response['error']}")
                 self.logger.log_auth("Login successful")
                 
-                # Wait a moment for authentication to complete
-                await asyncio.sleep(1)
-                
                 self.logger.log_subscription("Setting up subscriptions...")
-                await self.tlx.set_cancel_on_disconnect(6)
-                await self.tlx.private_subscribe(["session.orders", "account.portfolio", "trades"])
+                # Independent requests, sent in one pass
+                await asyncio.gather(
+                    self.tlx.set_cancel_on_disconnect(self._CANCEL_ON_DISCONNECT_SECS),
+                    self.tlx.private_subscribe(self._SUBSCRIPTIONS),
+                )
                 self.logger.log_subscription("Subscriptions set up successfully")
 
+                self._ws_ref = self.tlx.ws
                 self.authenticated.set()  # Signal that we are authenticated
                 return True
                 
@@ -62,8 +102,7 @@ class WebSocketHandler:
                 self.authenticated.clear()  # Signal that we are no longer authenticated
                 self.logger.log_error(f"Connection issue during setup (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
+                    await asyncio.sleep(backoff_delay(attempt))
                     continue
                 else:
                     return False
@@ -72,8 +111,7 @@ class WebSocketHandler:
                 self.authenticated.clear()  # Signal that we are no longer authenticated
                 self.logger.log_error(f"Error during connection and authentication (attempt {attempt + 1}/{max_retries}): {e}", exc_info=True)
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2
+                    await asyncio.sleep(backoff_delay(attempt))
                     continue
                 else:
                     return False
@@ -95,14 +133,18 @@ class WebSocketHandler:
             
             # Test authentication by requesting account summary
             self.logger.log_connection_test("Testing authentication with account summary...")
-            await self.tlx.account_summary()
+            await self.tlx.account_summary(id=ACCOUNT_SUMMARY_ID)
             
             # Test instrument validity
             self.logger.log_connection_test(f"Testing instrument validity: {instrument_name}")
-            await self.tlx.instrument(instrument_name)
+            await self.tlx.instrument(instrument_name, id=INSTRUMENT_ID)
             
-            # Wait a bit for responses
-            await asyncio.sleep(3)
+            # Wait for both responses
+            responses = await self._await_responses((ACCOUNT_SUMMARY_ID, INSTRUMENT_ID))
+            for response in responses.values():
+                if "error" in response:
+                    self.logger.log_error(f"[CONNECTION_TEST] Request failed: {response['error']}")
+                    return False
             
             self.logger.log_connection_test("Authentication and instrument test completed")
             return True
@@ -111,22 +153,90 @@ class WebSocketHandler:
             self.logger.log_error(f"[CONNECTION_TEST] Error: {e}", exc_info=True)
             return False
     
-    async def websocket_receiver(self):
-        """Single coroutine responsible for receiving all websocket messages"""
-        self.logger.log_info("Starting websocket receiver...")
+    async def _await_responses(self, ids: Tuple[int, ...], timeout: float = SETUP_TIMEOUT) -> Dict[int, dict]:
+        """
+        Read frames until the responses to all the given request ids have arrived, and return them by id.
+        Every frame, including those responses, is processed as usual. Only used during setup,
+        while the message loop is not receiving. Raises TimeoutError after timeout seconds.
+        """
+        waiting = set(ids)
+        responses = {}
+        async with asyncio.timeout(timeout):
+            while waiting:
+                msg = orjson.loads(await self.tlx.receive())
+                request_id = msg.get("id")
+                if request_id in waiting:
+                    waiting.discard(request_id)
+                    responses[request_id] = msg
+                await self.process_message(msg)
+        return responses
+
+    async def process_message(self, msg: dict) -> bool:
+        """Process a single websocket message, already decoded by the receive loop"""
+
+        for key, handler in self._dispatch.items():
+            if key in msg:
+                handler(msg)
+                break
+        else:
+            self.logger.log_unknown_message(msg)
+        
+        return True  # Continue processing
+
+    def _handle_channel(self, msg: dict):
+        """Subscription notification"""
+        self.notification_handler(msg["channel_name"], msg["notification"])
+
+    def _handle_result(self, msg: dict):
+        """Response to one of our requests; tickers and account summaries are forwarded as notifications"""
+        result = msg["result"]
+        self.logger.log_result(result)
+        if isinstance(result, dict):
+            # Ticker responses arrive every second, account summaries every few, so probe tickers first
+            if "best_bid_price" in result and "best_ask_price" in result:
+                self.notification_handler("ticker", result)
+                return
+            if "account_number" in result:
+                self.notification_handler("account.summary", {"result": result})
+                return
+        log.debug("Received result without price data: %s", result)
+
+    def _handle_error(self, msg: dict):
+        """Error response; passed up to be handled"""
+        self.logger.log_error(f"[ERROR] Received error from exchange: {msg}")
+        self.notification_handler("error", msg["error"])
+    
+    async def start_message_processing(self):
+        """Receive websocket messages and process each one as it arrives"""
+        self.is_running = True
         consecutive_errors = 0
         max_consecutive_errors = 3
+        received = 0
+
+        # Bound once; none of these objects change across reconnects
+        receive = self.tlx.receive
+        log_msg = self.logger.log_websocket_message
+        authed = self.authenticated.is_set
+        process = self.process_message
+        loads = orjson.loads
+        # Log levels are checked once per loop entry rather than per frame
+        debug = log.isEnabledFor(logging.DEBUG)
+        log_frames = self.logger.traffic_enabled()
         
+        self.logger.log_info("Entering main message processing loop...")
         while self.is_running:
             try:
-                # This loop now only receives. Reconnection is handled by exceptions.
-                if not self.tlx.connection_healthy() or not self.authenticated.is_set():
+                # Reconnection is handled by exceptions.
+                ws = self._ws_ref
+                if ws is None or ws.state not in _LIVE_STATES or not authed():
                     raise websockets.exceptions.ConnectionClosedError(None, "Connection unhealthy or not authenticated")
 
-                log.debug("Waiting for websocket message...")
-                msg = await self.tlx.receive()
-                self.logger.log_websocket_message(msg)
-                await self.message_queue.put(msg)
+                if debug:
+                    log.debug("Waiting for websocket message...")
+                # Raw bytes (see Thalex.receive); orjson validates UTF-8 itself
+                msg = await receive()
+                if log_frames:
+                    log_msg(msg)
                 consecutive_errors = 0  # Reset error counter on successful message
                 
             except (websockets.exceptions.ConnectionClosedError, websockets.exceptions.WebSocketException) as e:
@@ -135,108 +245,59 @@ class WebSocketHandler:
                 self.logger.log_error(f"WebSocket connection issue (attempt {consecutive_errors}/{max_consecutive_errors}): {e}")
                 
                 if consecutive_errors >= max_consecutive_errors:
-                    self.logger.log_error("Max consecutive connection errors reached, stopping receiver.")
-                    await self.message_queue.put(None)
+                    self.logger.log_error("Max consecutive connection errors reached, stopping message loop.")
                     break
 
                 self.logger.log_info("Attempting to reconnect and re-authenticate...")
                 try:
-                    # Attempt to fully reconnect and re-authenticate
-                    await self.connect_and_authenticate()
+                    # One attempt per pass; this loop owns the retry count and the backoff
+                    await self.connect_and_authenticate(max_retries=1)
                     if self.authenticated.is_set():
                         self.logger.log_info("Re-authentication successful.")
                         consecutive_errors = 0
                     else:
                         self.logger.log_error("Re-authentication failed. Retrying...")
-                        await asyncio.sleep(5) # Wait before next retry
+                        await asyncio.sleep(backoff_delay(consecutive_errors)) # Wait before next retry
                 except Exception as recon_e:
                     self.logger.log_error(f"Error during re-authentication attempt: {recon_e}")
-                    await asyncio.sleep(5) # Wait before next retry
+                    await asyncio.sleep(backoff_delay(consecutive_errors)) # Wait before next retry
+                continue
 
             except Exception as e:
                 consecutive_errors += 1
-                self.logger.log_error(f"Unexpected error in websocket receiver (attempt {consecutive_errors}/{max_consecutive_errors}): {e}", exc_info=True)
+                self.logger.log_error(f"Unexpected error while receiving (attempt {consecutive_errors}/{max_consecutive_errors}): {e}", exc_info=True)
                 
                 if consecutive_errors >= max_consecutive_errors:
-                    self.logger.log_error("Max consecutive errors reached, stopping receiver")
-                    await self.message_queue.put(None)
+                    self.logger.log_error("Max consecutive errors reached, stopping message loop")
                     break
                 
                 await asyncio.sleep(2)
-        
-        self.logger.log_info("WebSocket receiver stopped")
-    
-    async def process_message(self, msg: Any) -> bool:
-        """Process a single websocket message"""
-        try:
-            if isinstance(msg, str):
-                msg = json.loads(msg)
-            log.debug(f"Processing message: {msg.get('channel_name', 'unknown')}")
-        except json.JSONDecodeError as e:
-            self.logger.log_error(f"Failed to parse message: {e}")
-            return True  # Continue processing
+                continue
 
-        if "channel_name" in msg:
-            await self.notification_handler(msg["channel_name"], msg["notification"])
-        elif "result" in msg:
-            result = msg.get("result")
-            self.logger.log_result(result)
-            # Handle account summary response
-            if isinstance(result, dict) and "account_number" in result:
-                await self.notification_handler("account.summary", {"result": result})
-            # Handle ticker response
-            elif result is not None and "best_bid_price" in result and "best_ask_price" in result:
-                await self.notification_handler("ticker", result)
-            else:
-                log.debug(f"Received result without price data: {result}")
-        elif "error" in msg:
-            self.logger.log_error(f"[ERROR] Received error from exchange: {msg}")
-            # Pass the error notification up to be handled
-            if "error" in msg:
-                await self.notification_handler("error", msg["error"])
-        else:
-            self.logger.log_unknown_message(msg)
-        
-        return True  # Continue processing
-    
-    async def start_message_processing(self):
-        """Start the main message processing loop"""
-        self.is_running = True
-        self.receiver_task = asyncio.create_task(self.websocket_receiver())
-        
-        self.logger.log_info("Entering main message processing loop...")
-        while self.is_running:
+            received += 1
+            if received % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+
+            # Frames are decoded once, right where they are received
             try:
-                log.debug("Waiting for message from queue...")
-                msg = await self.message_queue.get()
-                if msg is None:
-                    self.logger.log_error("Received None message from queue - receiver error")
-                    break
+                msg = loads(msg)
+            except orjson.JSONDecodeError as e:
+                self.logger.log_error(f"Failed to parse message: {e}")
+                continue
 
-                should_continue = await self.process_message(msg)
+            # A failure while handling one message must not count as a connection error
+            try:
+                should_continue = await process(msg)
                 if not should_continue:
                     break
-
-            except websockets.exceptions.ConnectionClosedError as e:
-                self.logger.log_error(f"WebSocket connection closed: {e}")
-                break
             except Exception as e:
                 self.logger.log_error(f"Error processing message: {e}", exc_info=True)
-                continue
         
         self.logger.log_info("Main message loop ended")
     
     async def stop(self):
         """Stop the websocket handler"""
         self.is_running = False
-        if self.receiver_task and not self.receiver_task.done():
-            self.receiver_task.cancel()
-            try:
-                await self.receiver_task
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                self.logger.log_error(f"Error cancelling receiver task: {e}")
     
     async def cleanup(self):
         """Clean up websocket connections"""
@@ -244,7 +305,8 @@ class WebSocketHandler:
             await self.stop()
             
             # Handle session cancellation and disconnect
-            if hasattr(self.tlx, 'ws') and self.tlx.ws and not self.tlx.ws.closed:
+            ws = self.tlx.ws
+            if ws is not None and ws.state is WsState.OPEN:
                 try:
                     await self.tlx.cancel_session()
                 except websockets.exceptions.ConnectionClosedError:
@@ -260,45 +322,44 @@ class WebSocketHandler:
         except Exception as e:
             self.logger.log_error(f"Error during cleanup: {e}")
     
-    async def ticker_loop(self, instrument_name: str):
-        """Periodic loop to request ticker updates"""
-        self.logger.log_info("Starting ticker loop...")
+    async def periodic_loop(self, instrument_name: str):
+        """Periodic loop requesting a ticker every ~1s and, on every fifth pass, the account summary with it"""
+        self.logger.log_info("Starting periodic request loop...")
+        passes = 0
+        # Passes are scheduled against deadlines so request latency does not stretch the period
+        loop = asyncio.get_running_loop()
+        next_pass = loop.time()
         while self.is_running:
             try:
                 await self.authenticated.wait()  # Wait until authenticated
 
                 # Log before making the request
-                log.debug(f"About to request ticker for {instrument_name}")
+                log.debug("About to request ticker for %s", instrument_name)
                 
-                # Make the request with explicit error handling
-                try:
-                    await self.tlx.ticker(instrument_name)
-                    log.debug("Ticker request completed successfully")
-                except websockets.exceptions.ConnectionClosedError as e:
-                    self.logger.log_error(f"Ticker loop: WebSocket connection closed during ticker request: {e}")
-                    self.authenticated.clear()  # Connection is lost, clear the event
-                except Exception as e:
-                    self.logger.log_error(f"Ticker loop: Unexpected error during ticker request: {e}", exc_info=True)
-                    self.authenticated.clear()  # Assume connection issue
+                # Send whatever is due in one pass; every request's outcome is inspected
+                pending = [self.tlx.ticker(instrument_name)]
+                if passes % ACCOUNT_SUMMARY_EVERY == 0:
+                    pending.append(self.tlx.account_summary())
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, websockets.exceptions.ConnectionClosedError):
+                        self.logger.log_error(f"Periodic loop: WebSocket connection closed during request: {result}")
+                        self.authenticated.clear()  # Connection is lost, clear the event
+                    elif isinstance(result, Exception):
+                        self.logger.log_error(f"Periodic loop: Unexpected error during request: {result}", exc_info=result)
+                        self.authenticated.clear()  # Assume connection issue
+                    elif isinstance(result, BaseException):
+                        raise result
+                log.debug("Periodic requests completed")
+                passes += 1
                 
             except Exception as e:
-                self.logger.log_error(f"Ticker loop: Fatal error in loop: {e}", exc_info=True)
+                self.logger.log_error(f"Periodic loop: Fatal error in loop: {e}", exc_info=True)
                 # Wait a bit longer on error
                 await asyncio.sleep(5)
+                next_pass = loop.time()
                 continue
             
-            await asyncio.sleep(1)
-    
-    async def account_summary_loop(self):
-        """Periodic loop to request account summary updates"""
-        while self.is_running:
-            try:
-                await self.authenticated.wait()  # Wait until authenticated
-                await self.tlx.account_summary()
-            except websockets.exceptions.ConnectionClosedError as e:
-                self.logger.log_error(f"Account summary loop: WebSocket connection closed: {e}")
-                self.authenticated.clear()  # Connection is lost, clear the event
-            except Exception as e:
-                self.logger.log_error(f"Error in account summary loop: {e}")
-                self.authenticated.clear()  # Assume connection issue
-            await asyncio.sleep(5)  # Update every 5 seconds 
\ No newline at end of file
+            # ~1s, jittered; after a stall (e.g. waiting for re-authentication) restart from now instead of catching up
+            next_pass = max(next_pass + random.uniform(0.9, 1.1), loop.time())
+            await asyncio.sleep(next_pass - loop.time())